@@ -39,6 +39,7 @@ def on_disconnect(client, userdata, rc):
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("package_id", type=str, help="패키지 ID를 입력하세요.")
+    parser.add_argument("--batch", type=int, default=1, help="MQTT 메시지 하나에 묶어 보낼 RFID 개수 (기본 1: 건별 전송)")
     args = parser.parse_args()
     package_id = args.package_id
     
@@ -46,6 +47,8 @@ def main():
     bin_allocation = get_package_bin_allocation(package_id)
     if isinstance(bin_allocation, str):
         bin_allocation = json.loads(bin_allocation)
+    # bin_allocation은 DynamoDB map이라 수량이 Decimal로 옴
+    bin_allocation = {bin_id: int(qty) for bin_id, qty in (bin_allocation or {}).items()}
     rfid_ids = get_rfids_by_package_id(package_id)
     if not bin_allocation or not rfid_ids:
         print("bin_allocation 또는 rfid_ids가 없습니다.")
@@ -72,18 +75,27 @@ def main():
 
     idx = 0
     now_str = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    reads = []
     for bin_id, quantity in bin_allocation.items():
         for _ in range(quantity):
-            rfid_id = rfid_ids[idx]
-            payload = json.dumps({
-                "rfid_id": rfid_id,
+            reads.append({
+                "rfid_id": rfid_ids[idx],
                 "package_id": package_id,
                 "bin_id": bin_id,
                 "binned_date": now_str
             })
+            idx += 1
+    if args.batch > 1:
+        for i in range(0, len(reads), args.batch):
+            payload = json.dumps({"reads": reads[i:i + args.batch]})
+            result = client.publish(TOPIC, payload)
+            print(f"Published {len(reads[i:i + args.batch])} reads, result: {result.rc}")
+            time.sleep(0.5)
+    else:
+        for read in reads:
+            payload = json.dumps(read)
             result = client.publish(TOPIC, payload)
             print(f"Published: {payload}, result: {result.rc}")
-            idx += 1
             time.sleep(0.5)
     client.loop_stop()
     client.disconnect()
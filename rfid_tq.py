@@ -42,6 +42,7 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("package_id", type=str, help="패키지 ID를 입력하세요.")
     parser.add_argument("quantity", type=int, help="생성할 RFID 개수를 입력하세요.")
+    parser.add_argument("--batch", type=int, default=1, help="MQTT 메시지 하나에 묶어 보낼 RFID 개수 (기본 1: 건별 전송)")
     args = parser.parse_args()
     package_id = args.package_id
     quantity = args.quantity
@@ -61,12 +62,23 @@ def main():
     while not connected_flag:
         time.sleep(0.1)
 
-    for _ in range(quantity):
-        rfid = get_rfid()
-        payload = json.dumps({"rfid_id": rfid, "package_id": package_id, "tq_date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
-        result = client.publish(TOPIC, payload)
-        print(f"Published: {payload}, result: {result.rc}")
-        time.sleep(1)
+    if args.batch > 1:
+        reads = [
+            {"rfid_id": get_rfid(), "package_id": package_id, "tq_date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+            for _ in range(quantity)
+        ]
+        for i in range(0, len(reads), args.batch):
+            payload = json.dumps({"reads": reads[i:i + args.batch]})
+            result = client.publish(TOPIC, payload)
+            print(f"Published {len(reads[i:i + args.batch])} reads, result: {result.rc}")
+            time.sleep(1)
+    else:
+        for _ in range(quantity):
+            rfid = get_rfid()
+            payload = json.dumps({"rfid_id": rfid, "package_id": package_id, "tq_date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+            result = client.publish(TOPIC, payload)
+            print(f"Published: {payload}, result: {result.rc}")
+            time.sleep(1)
     client.loop_stop()
     client.disconnect()
 
@@ -0,0 +1,39 @@
+# scripts/backfill_bin_capacity.py
+# 기존 Bins 레코드에 capacity_bucket을 채워 CapacityBucketIndex에 올립니다.
+import os
+import sys
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from common.bin_capacity import capacity_bucket
+
+REGION = 'us-east-2'
+
+def backfill(table_name='Bins', endpoint_url=None):
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url)
+    table = dynamodb.Table(table_name)
+    scan_kwargs = {'ProjectionExpression': 'bin_id, availability_vol, capacity_bucket'}
+    updated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            bucket = capacity_bucket(item.get('availability_vol'))
+            if item.get('capacity_bucket') == bucket:
+                continue
+            if bucket is None:
+                table.update_item(Key={'bin_id': item['bin_id']}, UpdateExpression="REMOVE capacity_bucket")
+            else:
+                table.update_item(
+                    Key={'bin_id': item['bin_id']},
+                    UpdateExpression="SET capacity_bucket = :b",
+                    ExpressionAttributeValues={':b': bucket}
+                )
+            updated += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"✔ Done: {updated} bins re-bucketed in {table_name}")
+
+if __name__ == '__main__':
+    endpoint = sys.argv[1] if len(sys.argv) > 1 else None
+    backfill(endpoint_url=endpoint)
@@ -0,0 +1,41 @@
+# scripts/backfill_open_order_count.py
+# PickOrders를 집계해 각 PickSlip의 open_order_count(CLOSE가 아닌 주문 수)를 채웁니다.
+# close_pick_order는 이 카운터를 트랜잭션으로 감소시키고 0이 되면 READY-FOR-PACKING으로 전환합니다.
+import sys
+from collections import Counter
+import boto3
+
+REGION = 'us-east-2'
+
+def backfill(endpoint_url=None):
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url)
+    orders = dynamodb.Table('PickOrders')
+    slips = dynamodb.Table('PickSlips')
+
+    open_counts = Counter()
+    scan_kwargs = {'ProjectionExpression': 'pick_slip_id, pick_order_status'}
+    while True:
+        response = orders.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            if not item.get('pick_slip_id'):
+                continue
+            open_counts[item['pick_slip_id']] += 0 if item.get('pick_order_status') == 'CLOSE' else 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    for pick_slip_id, count in open_counts.items():
+        try:
+            slips.update_item(
+                Key={'pick_slip_id': pick_slip_id},
+                UpdateExpression="SET open_order_count = :c",
+                ConditionExpression="attribute_exists(pick_slip_id)",
+                ExpressionAttributeValues={':c': count}
+            )
+        except slips.meta.client.exceptions.ConditionalCheckFailedException:
+            print(f"Pick slip {pick_slip_id} not found, skipping")
+    print(f"✔ Done: open_order_count set on {len(open_counts)} pick slips")
+
+if __name__ == '__main__':
+    endpoint = sys.argv[1] if len(sys.argv) > 1 else None
+    backfill(endpoint_url=endpoint)
@@ -0,0 +1,37 @@
+# scripts/backfill_packing_queue.py
+# READY-FOR-PACKING 상태의 PickSlips에 ready_packing_zone을 채워 PackingQueueIndex에 올리고,
+# 그 외 상태의 슬립에서는 제거합니다.
+import sys
+import boto3
+
+REGION = 'us-east-2'
+
+def backfill(table_name='PickSlips', endpoint_url=None):
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url)
+    table = dynamodb.Table(table_name)
+    scan_kwargs = {'ProjectionExpression': 'pick_slip_id, packing_zone, pick_slip_status, ready_packing_zone'}
+    updated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            ready = item.get('pick_slip_status') == 'READY-FOR-PACKING' and item.get('packing_zone')
+            if ready and item.get('ready_packing_zone') != item['packing_zone']:
+                table.update_item(
+                    Key={'pick_slip_id': item['pick_slip_id']},
+                    UpdateExpression="SET ready_packing_zone = packing_zone"
+                )
+                updated += 1
+            elif not ready and 'ready_packing_zone' in item:
+                table.update_item(
+                    Key={'pick_slip_id': item['pick_slip_id']},
+                    UpdateExpression="REMOVE ready_packing_zone"
+                )
+                updated += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"✔ Done: {updated} pick slips updated in {table_name}")
+
+if __name__ == '__main__':
+    endpoint = sys.argv[1] if len(sys.argv) > 1 else None
+    backfill(endpoint_url=endpoint)
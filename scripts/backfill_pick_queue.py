@@ -0,0 +1,37 @@
+# scripts/backfill_pick_queue.py
+# READY-FOR-PICKING 상태의 PickOrders에 ready_picker_id를 채워 PickerQueueIndex에 올리고,
+# 그 외 상태의 주문에서는 제거합니다.
+import sys
+import boto3
+
+REGION = 'us-east-2'
+
+def backfill(table_name='PickOrders', endpoint_url=None):
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url)
+    table = dynamodb.Table(table_name)
+    scan_kwargs = {'ProjectionExpression': 'pick_order_id, picker_id, pick_order_status, ready_picker_id'}
+    updated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            ready = item.get('pick_order_status') == 'READY-FOR-PICKING' and item.get('picker_id')
+            if ready and item.get('ready_picker_id') != item['picker_id']:
+                table.update_item(
+                    Key={'pick_order_id': item['pick_order_id']},
+                    UpdateExpression="SET ready_picker_id = picker_id"
+                )
+                updated += 1
+            elif not ready and 'ready_picker_id' in item:
+                table.update_item(
+                    Key={'pick_order_id': item['pick_order_id']},
+                    UpdateExpression="REMOVE ready_picker_id"
+                )
+                updated += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"✔ Done: {updated} pick orders updated in {table_name}")
+
+if __name__ == '__main__':
+    endpoint = sys.argv[1] if len(sys.argv) > 1 else None
+    backfill(endpoint_url=endpoint)
@@ -0,0 +1,114 @@
+# scripts/backfill_status_shard.py
+# Packages / StoringOrders / PickOrders / PickSlips에 status_shard / status_date를 채워 StatusDateIndex에 올립니다.
+# status_date는 상태별 날짜 속성(STATUS_DATE_FIELDS)에서 가져오고, 없으면 실행 시각을 씁니다.
+# 상태가 바뀐 항목은 건너뛰므로 운영 중에 돌려도 안전합니다.
+# 테이블의 StatusDateIndex가 ACTIVE일 때만 실행합니다 (--wait: ACTIVE가 될 때까지 대기).
+#   python scripts/backfill_status_shard.py [endpoint_url] [--table Packages] [--wait]
+import os
+import sys
+import time
+from datetime import datetime
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from common.sharding import STATUS_INDEX, status_shard
+
+REGION = 'us-east-2'
+WAIT_SECONDS = 30
+TABLES = {
+    # table -> (primary key, status attribute)
+    'Packages': ('package_id', 'status'),
+    'StoringOrders': ('storing_order_id', 'status'),
+    'PickOrders': ('pick_order_id', 'pick_order_status'),
+    'PickSlips': ('pick_slip_id', 'pick_slip_status'),
+}
+STATUS_DATE_FIELDS = {
+    'Packages': {
+        'READY-FOR-RFID-ATTACH': 'tq_quality_check_date',
+        'TQ-QUALITY-CHECK-FAILED': 'tq_quality_check_date',
+        'TQ-CHECKING': 'tq_start_date',
+        'READY-FOR-BIN-ALLOCATION': 'ready_for_bin_allocation_date',
+        'READY-FOR-BINNING': 'bin_allocation_date',
+        'BINNING': 'bin_allocation_date',
+        'BINNED': 'binned_date',
+    },
+    'StoringOrders': {
+        'OPEN': 'order_date',
+        'RECEIVED': 'received_date',
+    },
+    'PickOrders': {
+        'READY-FOR-PICKING': 'order_created_date',
+        'CLOSE': 'picked_date',
+    },
+    'PickSlips': {
+        'READY-FOR-PACKING': 'ready_for_packing_date',
+        'PACKING-IN-PROGRESS': 'packing_start_date',
+        'READY-FOR-DISPATCH': 'packed_date',
+        'DISPATCHED': 'dispatched_date',
+    },
+}
+
+def status_date(table_name, item, default):
+    status = item.get(TABLES[table_name][1])
+    return item.get(STATUS_DATE_FIELDS[table_name].get(status)) or default
+
+def index_status(table):
+    table.reload()
+    for index in table.global_secondary_indexes or []:
+        if index['IndexName'] == STATUS_INDEX:
+            return index.get('IndexStatus', 'ACTIVE')
+    return None
+
+def index_ready(table, wait=False):
+    while True:
+        status = index_status(table)
+        if status == 'ACTIVE':
+            return True
+        if not wait:
+            print(f"✘ {table.name}: {STATUS_INDEX} is {status or 'not deployed'}; deploy it first (README Status Sharding).")
+            return False
+        print(f"  {table.name}: {STATUS_INDEX} is {status or 'not deployed'}, waiting...")
+        time.sleep(WAIT_SECONDS)
+
+def backfill(table_name='Packages', endpoint_url=None, wait=False):
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url)
+    table = dynamodb.Table(table_name)
+    if not index_ready(table, wait):
+        return False
+    key_name, status_name = TABLES[table_name]
+    scan_kwargs = {}
+    now = datetime.now().isoformat()
+    updated = skipped = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            status = item.get(status_name)
+            if not status:
+                continue
+            shard = status_shard(status, item[key_name])
+            if item.get('status_shard') == shard and item.get('status_date'):
+                continue
+            try:
+                table.update_item(
+                    Key={key_name: item[key_name]},
+                    UpdateExpression="SET status_shard = :shard, status_date = if_not_exists(status_date, :date)",
+                    ConditionExpression="#s = :status",
+                    ExpressionAttributeNames={'#s': status_name},
+                    ExpressionAttributeValues={':shard': shard, ':date': status_date(table_name, item, now), ':status': status}
+                )
+                updated += 1
+            except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+                print(f"  changed while backfilling, skipped: {item[key_name]}")
+                skipped += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"✔ Done: {updated} items updated, {skipped} skipped in {table_name}")
+    return True
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    endpoint = args[0] if args and '://' in args[0] else None
+    tables = [sys.argv[sys.argv.index('--table') + 1]] if '--table' in sys.argv else list(TABLES)
+    results = [backfill(name, endpoint_url=endpoint, wait='--wait' in sys.argv) for name in tables]
+    sys.exit(0 if all(results) else 1)
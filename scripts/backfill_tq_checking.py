@@ -0,0 +1,52 @@
+# scripts/backfill_tq_checking.py
+# TQ-CHECKING 상태의 Packages에 tq_checking(+ 없으면 tq_start_date)을 채워 TqCheckingIndex에 올리고,
+# 그 외 상태의 패키지에서는 제거합니다. tq_reaper 배포 직후 한 번 실행합니다.
+import sys
+from datetime import datetime
+import boto3
+
+REGION = 'us-east-2'
+
+def backfill(table_name='Packages', endpoint_url=None):
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url)
+    table = dynamodb.Table(table_name)
+    scan_kwargs = {
+        'ProjectionExpression': 'package_id, #s, tq_checking',
+        'ExpressionAttributeNames': {'#s': 'status'}
+    }
+    now = datetime.now().isoformat()
+    updated = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            checking = item.get('status') == 'TQ-CHECKING'
+            try:
+                if checking and 'tq_checking' not in item:
+                    # 시작 시각을 모르는 패키지는 지금부터 staleness를 셈
+                    table.update_item(
+                        Key={'package_id': item['package_id']},
+                        UpdateExpression="SET tq_checking = #s, tq_start_date = if_not_exists(tq_start_date, :now)",
+                        ConditionExpression="#s = :checking",
+                        ExpressionAttributeNames={'#s': 'status'},
+                        ExpressionAttributeValues={':now': now, ':checking': 'TQ-CHECKING'}
+                    )
+                    updated += 1
+                elif not checking and 'tq_checking' in item:
+                    table.update_item(
+                        Key={'package_id': item['package_id']},
+                        UpdateExpression="REMOVE tq_checking",
+                        ConditionExpression="#s <> :checking",
+                        ExpressionAttributeNames={'#s': 'status'},
+                        ExpressionAttributeValues={':checking': 'TQ-CHECKING'}
+                    )
+                    updated += 1
+            except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+                print(f"  changed while backfilling, skipped: {item['package_id']}")
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"✔ Done: {updated} packages updated in {table_name}")
+
+if __name__ == '__main__':
+    endpoint = sys.argv[1] if len(sys.argv) > 1 else None
+    backfill(endpoint_url=endpoint)
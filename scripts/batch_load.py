@@ -1,10 +1,18 @@
 # scripts/batch_load.py
 import os
+import sys
 import csv
 import boto3
 from decimal import Decimal
+from datetime import datetime
 import ast
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from common.bin_capacity import capacity_bucket
+from common.sharding import status_shard
+from backfill_status_shard import status_date, TABLES as SHARDED_TABLES
+import backfill_open_order_count
+
 # --- CONFIGURE THESE PATHS AS NEEDED ---
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
 REGION = 'us-east-2'
@@ -78,14 +86,40 @@ def batch_load(table_name, csv_path):
                     continue
                 if pk:
                     seen_keys.add(item[pk])
+                # READY-FOR-PICKING 주문만 PickerQueueIndex에 올림
+                if table_name == 'PickOrders' and item.get('pick_order_status') == 'READY-FOR-PICKING':
+                    item['ready_picker_id'] = item['picker_id']
+                # READY-FOR-PACKING 슬립만 PackingQueueIndex에 올림
+                if table_name == 'PickSlips' and item.get('pick_slip_status') == 'READY-FOR-PACKING' and item.get('packing_zone'):
+                    item['ready_packing_zone'] = item['packing_zone']
+                # TQ-CHECKING 패키지만 TqCheckingIndex에 올림 (tq_start_date 필요)
+                if table_name == 'Packages' and item.get('status') == 'TQ-CHECKING' and item.get('tq_start_date'):
+                    item['tq_checking'] = 'TQ-CHECKING'
+                # 상태가 있는 항목은 StatusDateIndex에 올림 (날짜는 backfill_status_shard와 같은 규칙)
+                if table_name in SHARDED_TABLES:
+                    key_name, status_name = SHARDED_TABLES[table_name]
+                    if item.get(status_name) and item.get(key_name):
+                        item['status_shard'] = status_shard(item[status_name], item[key_name])
+                        item['status_date'] = status_date(table_name, item, datetime.now().isoformat())
+                # Bins는 CapacityBucketIndex에 들어가도록 capacity_bucket 계산
+                if table_name == 'Bins':
+                    bucket = capacity_bucket(item.get('availability_vol'))
+                    if bucket is not None:
+                        item['capacity_bucket'] = bucket
                 if item:
                     batch.put_item(Item=item)
     print(f"✔ Done: {table_name}")
 
 if __name__ == '__main__':
     # data 디렉토리의 모든 csv 파일에 대해 처리
+    loaded = set()
     for filename in os.listdir(DATA_DIR):
         if filename.endswith('.csv'):
             table_name = os.path.splitext(filename)[0]  # 확장자 제외한 파일명
             csv_path = os.path.join(DATA_DIR, filename)
             batch_load(table_name, csv_path)
+            loaded.add(table_name)
+    # PickSlips의 open_order_count는 PickOrders를 다 읽은 뒤에만 셀 수 있음
+    # (없으면 close_pick_order가 매번 PickSlipIdIndex 조회로 돌아감)
+    if {'PickSlips', 'PickOrders'} <= loaded:
+        backfill_open_order_count.backfill()
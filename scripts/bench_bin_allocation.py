@@ -0,0 +1,106 @@
+# scripts/bench_bin_allocation.py
+# 로컬 DynamoDB(예: docker run -p 8000:8000 amazon/dynamodb-local)에 10만 개 BIN을 만들고
+# 기존 전체 scan+sort 방식과 CapacityBucketIndex 기반 plan_allocation을 비교합니다.
+import os
+import sys
+import time
+import random
+import argparse
+from decimal import Decimal
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from common.bin_capacity import CAPACITY_INDEX, capacity_bucket, plan_allocation
+
+TABLE_NAME = 'BinsBench'
+
+def create_table(dynamodb):
+    try:
+        dynamodb.Table(TABLE_NAME).delete()
+        dynamodb.Table(TABLE_NAME).wait_until_not_exists()
+    except dynamodb.meta.client.exceptions.ResourceNotFoundException:
+        pass
+    table = dynamodb.create_table(
+        TableName=TABLE_NAME,
+        BillingMode='PAY_PER_REQUEST',
+        AttributeDefinitions=[
+            {'AttributeName': 'bin_id', 'AttributeType': 'S'},
+            {'AttributeName': 'capacity_bucket', 'AttributeType': 'N'},
+            {'AttributeName': 'availability_vol', 'AttributeType': 'N'},
+        ],
+        KeySchema=[{'AttributeName': 'bin_id', 'KeyType': 'HASH'}],
+        GlobalSecondaryIndexes=[{
+            'IndexName': CAPACITY_INDEX,
+            'KeySchema': [
+                {'AttributeName': 'capacity_bucket', 'KeyType': 'HASH'},
+                {'AttributeName': 'availability_vol', 'KeyType': 'RANGE'},
+            ],
+            'Projection': {'ProjectionType': 'KEYS_ONLY'},
+        }],
+    )
+    table.wait_until_exists()
+    return table
+
+def load_bins(table, count, seed):
+    rng = random.Random(seed)
+    with table.batch_writer() as batch:
+        for i in range(count):
+            vol = rng.choice([0, rng.randint(1, 5000), rng.randint(5000, 100000)])
+            item = {'bin_id': f'BIN{i}', 'availability_vol': vol}
+            bucket = capacity_bucket(vol)
+            if bucket is not None:
+                item['capacity_bucket'] = bucket
+            batch.put_item(Item=item)
+
+def legacy_plan(table, quantity, product_volume):
+    # 기존 bin_allocation 방식 (단, 페이지를 끝까지 읽도록 보정)
+    bins, kwargs = [], {}
+    while True:
+        response = table.scan(**kwargs)
+        bins.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    bins.sort(key=lambda x: x.get('availability_vol', 0), reverse=True)
+    total = product_volume * quantity
+    for b in bins:
+        if b.get('availability_vol', 0) >= total:
+            return {b['bin_id']: quantity}
+    return None
+
+def timed(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[-1]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--endpoint-url', default='http://localhost:8000')
+    parser.add_argument('--bins', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--legacy-runs', type=int, default=3)
+    parser.add_argument('--skip-load', action='store_true')
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource('dynamodb', region_name='us-east-2', endpoint_url=args.endpoint_url,
+                              aws_access_key_id='local', aws_secret_access_key='local')
+    if args.skip_load:
+        table = dynamodb.Table(TABLE_NAME)
+    else:
+        print(f"> Creating {TABLE_NAME} with {args.bins} bins...")
+        table = create_table(dynamodb)
+        load_bins(table, args.bins, seed=42)
+
+    cases = [('single bin', 10, Decimal(100)), ('multi bin', 400, Decimal(1000))]
+    for name, quantity, product_volume in cases:
+        p50, worst = timed(lambda: plan_allocation(table, quantity, product_volume), args.runs)
+        print(f"indexed  {name:10s}: p50={p50:8.1f} ms  max={worst:8.1f} ms")
+    p50, worst = timed(lambda: legacy_plan(table, 10, Decimal(100)), args.legacy_runs)
+    print(f"scan     single bin: p50={p50:8.1f} ms  max={worst:8.1f} ms")
+
+if __name__ == '__main__':
+    main()
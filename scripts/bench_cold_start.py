@@ -0,0 +1,72 @@
+# scripts/bench_cold_start.py
+# 핸들러 모듈마다 새 파이썬 프로세스에서 import 시간을 재서 cold start 비용(ms)을 보여줍니다.
+#   python scripts/bench_cold_start.py [--runs 5]
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+ENV_DEFAULTS = {
+    'AWS_DEFAULT_REGION': 'us-east-2',
+    'STORING_ORDERS_TABLE': 'StoringOrders',
+    'PACKAGES_TABLE': 'Packages',
+    'ITEMS_TABLE': 'Items',
+    'API_KEYS_TABLE': 'ApiKeys',
+    'BINS_TABLE': 'Bins',
+    'PRODUCTS_TABLE': 'Products',
+    'INVENTORY_TABLE': 'Inventory',
+    'PICK_ORDERS_TABLE': 'PickOrders',
+    'PICK_SLIPS_TABLE': 'PickSlips',
+    'TQ_RFID_SQS_QUEUE_URL': 'https://sqs.us-east-2.amazonaws.com/000000000000/tq-rfid-queue',
+    'BIN_RFID_SQS_QUEUE_URL': 'https://sqs.us-east-2.amazonaws.com/000000000000/bin-rfid-queue',
+}
+PROBE = """
+import sys, time, json, importlib
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+importlib.import_module({module!r})
+print(json.dumps((time.perf_counter() - start) * 1000))
+"""
+
+def handler_modules():
+    modules = []
+    for name in sorted(os.listdir(SRC_DIR)):
+        path = os.path.join(SRC_DIR, name)
+        if name.endswith('.py'):
+            modules.append(name[:-3])
+        elif os.path.isdir(path) and name != 'common':
+            for entry in ('app.py', 'lambda_function.py'):
+                if os.path.exists(os.path.join(path, entry)):
+                    modules.append(f"{name}.{entry[:-3]}")
+    return modules
+
+def measure(module, runs):
+    env = dict(os.environ)
+    for k, v in ENV_DEFAULTS.items():
+        env.setdefault(k, v)
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(src=SRC_DIR, module=module)],
+                             env=env, capture_output=True, text=True)
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1]
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    samples.sort()
+    return samples[len(samples) // 2], None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    print(f"{'handler':40s} {'import p50 (ms)':>16s}")
+    for module in handler_modules():
+        p50, error = measure(module, args.runs)
+        if error:
+            print(f"{module:40s} {'error':>16s}  {error}")
+        else:
+            print(f"{module:40s} {p50:16.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# scripts/bench_serialize.py
+# data/PickOrders.csv, data/PickSlips.csv 행을 DynamoDB에서 읽은 모양(숫자는 Decimal)으로 만들어
+# 응답 직렬화 방식별 시간을 비교합니다.
+#   python scripts/bench_serialize.py [--items 5000] [--runs 20]
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from common import serialize
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+class LegacyDecimalEncoder(json.JSONEncoder):
+    """The per-handler encoder this module replaced."""
+    def default(self, o):
+        if isinstance(o, Decimal):
+            if o % 1 > 0:
+                return float(o)
+            else:
+                return int(o)
+        return super(LegacyDecimalEncoder, self).default(o)
+
+
+def as_dynamodb(value):
+    # boto3 resource는 모든 숫자를 Decimal로 돌려줌
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return Decimal(str(value))
+    if isinstance(value, list):
+        return [as_dynamodb(v) for v in value]
+    if isinstance(value, dict):
+        return {k: as_dynamodb(v) for k, v in value.items()}
+    return value
+
+
+def load_items(name, count):
+    from batch_load import cast_value
+    with open(os.path.join(DATA_DIR, name), newline='', encoding='utf-8-sig') as f:
+        rows = [{k: cast_value(k, v) for k, v in row.items() if k is not None and v != ''} for row in csv.DictReader(f)]
+    items = []
+    while len(items) < count:
+        for row in rows:
+            item = as_dynamodb(row)
+            # 소수 수량도 섞어서 float 경로까지 측정
+            item['weight'] = Decimal(len(items) % 7) / Decimal(4)
+            items.append(item)
+    return items[:count]
+
+
+def timeit(fn, items, runs):
+    fn(items)
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(items)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=5000)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    stdlib = json.JSONEncoder(default=serialize.default, separators=(',', ':'), ensure_ascii=False)
+    candidates = [
+        ('legacy DecimalEncoder', lambda items: json.dumps(items, cls=LegacyDecimalEncoder)),
+        ('legacy respond (default=str)', lambda items: json.dumps(items, default=str)),
+        ('serialize (json)', stdlib.encode),
+    ]
+    if serialize.orjson is not None:
+        candidates.append(('serialize (orjson)', lambda items: serialize.orjson.dumps(
+            items, default=serialize.default, option=serialize.orjson.OPT_NON_STR_KEYS).decode()))
+
+    sys.path.insert(0, os.path.dirname(__file__))
+    for name in ('PickOrders.csv', 'PickSlips.csv'):
+        items = load_items(name, args.items)
+        print(f"{name}: {len(items)} items")
+        reference = json.loads(stdlib.encode(items))
+        for label, fn in candidates:
+            ms = timeit(fn, items, args.runs)
+            same = json.loads(fn(items)) == reference
+            print(f"  {label:<30} {ms:8.2f} ms  {'' if same else '(output differs)'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+# scripts/bench_status_shard.py
+# status_shard(write sharding) 부하 테스트.
+# 1) 파티션 stand-in: GSI 파티션마다 초당 쓰기 한도(--partition-wcu, DynamoDB는 1,000 WCU/s)를 두고
+#    여러 writer 스레드가 실제 status_shard() 키로 상태 쓰기를 보냅니다. throttle되면 SDK처럼 backoff 후 재시도하므로,
+#    shard 수에 따라 처리량(writes/s)이 어떻게 달라지는지 봅니다. DynamoDB Local은 파티션 한도를 흉내내지 않아 이 부분은 in-process로 돌립니다.
+# 2) --endpoint를 주면 로컬 DynamoDB에 StatusDateIndex 테이블을 만들고 같은 키로 쓴 뒤
+#    common.sharding.query_status의 scatter-gather 결과(날짜순, 누락/중복 없음)와 조회 시간을 확인합니다.
+#   python scripts/bench_status_shard.py --seconds 5 --shards 1,2,4,8
+#   python scripts/bench_status_shard.py --endpoint http://localhost:8000 --items 2000
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from common.sharding import STATUS_INDEX, status_keys, status_shard, query_status
+
+TABLE_NAME = 'StatusShardBench'
+# 트래픽 대부분이 몇 개 상태에 몰리는 분포 (PickOrders/PickSlips 기준)
+STATUS_MIX = [
+    ('READY-FOR-PICKING', 0.45),
+    ('READY-FOR-PACKING', 0.30),
+    ('PACKING-IN-PROGRESS', 0.10),
+    ('READY-FOR-DISPATCH', 0.10),
+    ('DISPATCHED', 0.05),
+]
+
+class PartitionStandIn:
+    """GSI partitions, each accepting at most `wcu` writes per 1-second window."""
+
+    def __init__(self, wcu):
+        self.wcu = wcu
+        self.lock = threading.Lock()
+        self.window = None
+        self.used = Counter()
+        self.accepted = Counter()
+        self.throttled = 0
+
+    def write(self, partition):
+        with self.lock:
+            window = int(time.monotonic())
+            if window != self.window:
+                self.window = window
+                self.used.clear()
+            if self.used[partition] >= self.wcu:
+                self.throttled += 1
+                return False
+            self.used[partition] += 1
+            self.accepted[partition] += 1
+            return True
+
+def run_writers(shards, wcu, writers, seconds, seed):
+    stand_in = PartitionStandIn(wcu)
+    statuses, weights = zip(*STATUS_MIX)
+    deadline = time.monotonic() + seconds
+    done = Counter()
+
+    def writer(n):
+        rng = random.Random(seed + n)
+        while time.monotonic() < deadline:
+            status = rng.choices(statuses, weights)[0]
+            partition = status_shard(status, f'PO{rng.randrange(10 ** 7)}', shards)
+            attempt = 0
+            # 같은 쓰기를 성공할 때까지 재시도 (boto3 standard retry와 같은 지수 backoff)
+            while not stand_in.write(partition):
+                if time.monotonic() >= deadline:
+                    return
+                time.sleep(min(0.5, 0.01 * (2 ** attempt)) * rng.random())
+                attempt += 1
+            done[n] += 1
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    total = sum(done.values())
+    hottest = max(stand_in.accepted.values()) / max(total, 1)
+    throttle_rate = stand_in.throttled / max(total + stand_in.throttled, 1)
+    return total / seconds, throttle_rate, hottest, len(stand_in.accepted)
+
+def create_table(dynamodb):
+    try:
+        dynamodb.Table(TABLE_NAME).delete()
+        dynamodb.Table(TABLE_NAME).wait_until_not_exists()
+    except dynamodb.meta.client.exceptions.ResourceNotFoundException:
+        pass
+    table = dynamodb.create_table(
+        TableName=TABLE_NAME,
+        BillingMode='PAY_PER_REQUEST',
+        AttributeDefinitions=[
+            {'AttributeName': 'pick_order_id', 'AttributeType': 'S'},
+            {'AttributeName': 'status_shard', 'AttributeType': 'S'},
+            {'AttributeName': 'status_date', 'AttributeType': 'S'},
+        ],
+        KeySchema=[{'AttributeName': 'pick_order_id', 'KeyType': 'HASH'}],
+        GlobalSecondaryIndexes=[{
+            'IndexName': STATUS_INDEX,
+            'KeySchema': [
+                {'AttributeName': 'status_shard', 'KeyType': 'HASH'},
+                {'AttributeName': 'status_date', 'KeyType': 'RANGE'},
+            ],
+            'Projection': {'ProjectionType': 'ALL'},
+        }],
+    )
+    table.wait_until_exists()
+    return table
+
+def check_queries(table, items, page_size, seed):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    expected = []
+    with table.batch_writer() as batch:
+        for i in range(items):
+            pick_order_id = f'PO{i}'
+            date = (start + timedelta(seconds=rng.randrange(86400))).isoformat()
+            batch.put_item(Item={'pick_order_id': pick_order_id, 'pick_order_status': 'READY-FOR-PICKING',
+                                 **status_keys('READY-FOR-PICKING', pick_order_id, date)})
+            expected.append(date)
+    expected.sort()
+
+    started = time.perf_counter()
+    dates, cursor, pages = [], None, 0
+    while True:
+        page, cursor = query_status(table, ('pick_order_id',), 'READY-FOR-PICKING', limit=page_size, cursor=cursor)
+        dates.extend(item['status_date'] for item in page)
+        pages += 1
+        if not cursor:
+            break
+    elapsed = time.perf_counter() - started
+    ok = dates == expected
+    print(f"scatter-gather: {len(dates)} items in {pages} pages, {elapsed * 1000:.0f} ms, {'OK' if ok else 'MISMATCH'}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shards', default='1,2,4,8', help='shard counts to compare (1 = unsharded)')
+    parser.add_argument('--partition-wcu', type=int, default=1000)
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--endpoint', help='DynamoDB Local endpoint, e.g. http://localhost:8000')
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--page-size', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"stand-in: {args.partition_wcu} writes/s per partition, {args.writers} writers, {args.seconds}s per run")
+    print(f"{'shards':>6} {'writes/s':>10} {'throttled':>10} {'hottest':>8} {'partitions':>10}")
+    baseline = None
+    for shards in [int(s) for s in args.shards.split(',')]:
+        rate, throttled, hottest, partitions = run_writers(shards, args.partition_wcu, args.writers, args.seconds, args.seed)
+        baseline = baseline or rate
+        print(f"{shards:>6} {rate:>10.0f} {throttled:>9.1%} {hottest:>8.1%} {partitions:>10}   x{rate / baseline:.1f}")
+
+    if args.endpoint:
+        import boto3
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-2', endpoint_url=args.endpoint)
+        ok = check_queries(create_table(dynamodb), args.items, args.page_size, args.seed)
+        sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
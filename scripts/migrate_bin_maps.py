@@ -0,0 +1,62 @@
+# scripts/migrate_bin_maps.py
+# Packages의 bin_allocation / bin_current JSON 문자열을 DynamoDB map(숫자 값)으로 바꾸고
+# binned_count(= bin_current 합계)를 채웁니다. 한 번만 돌리면 되며, 다시 돌려도 안전합니다.
+#   python scripts/migrate_bin_maps.py [endpoint_url] [--dry-run]
+import os
+import sys
+import boto3
+from boto3.dynamodb.conditions import Attr
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from common.bin_maps import parse_bin_map
+
+REGION = 'us-east-2'
+
+def migrate(table_name='Packages', endpoint_url=None, dry_run=False):
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url)
+    table = dynamodb.Table(table_name)
+    scan_kwargs = {
+        'ProjectionExpression': 'package_id, bin_allocation, bin_current, binned_count',
+        'FilterExpression': Attr('bin_allocation').attribute_type('S') | Attr('bin_current').attribute_type('S')
+            | (Attr('bin_allocation').exists() & Attr('binned_count').not_exists())
+    }
+    migrated = skipped = 0
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            bin_allocation = parse_bin_map(item.get('bin_allocation'))
+            bin_current = parse_bin_map(item.get('bin_current'))
+            binned_count = sum(bin_current.values())
+            print(f"{item['package_id']}: allocation={bin_allocation} current={bin_current} binned_count={binned_count}")
+            if dry_run:
+                continue
+            # 읽은 값이 그대로일 때만 덮어씀 (실행 중인 consumer와 경합 방지)
+            names = {'#ba': 'bin_allocation', '#bc': 'bin_current'}
+            values = {':ba': bin_allocation, ':bc': bin_current, ':n': binned_count}
+            conditions = []
+            for placeholder, attr in (('#ba', 'bin_allocation'), ('#bc', 'bin_current')):
+                if attr in item:
+                    values[f':old_{attr}'] = item[attr]
+                    conditions.append(f"{placeholder} = :old_{attr}")
+                else:
+                    conditions.append(f"attribute_not_exists({placeholder})")
+            try:
+                table.update_item(
+                    Key={'package_id': item['package_id']},
+                    UpdateExpression="SET #ba = :ba, #bc = :bc, binned_count = :n",
+                    ConditionExpression=' AND '.join(conditions),
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values
+                )
+                migrated += 1
+            except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+                print(f"  changed while migrating, skipped: {item['package_id']}")
+                skipped += 1
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    print(f"✔ Done: {migrated} packages migrated, {skipped} skipped in {table_name}")
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    migrate(endpoint_url=args[0] if args else None, dry_run='--dry-run' in sys.argv)
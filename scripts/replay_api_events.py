@@ -0,0 +1,68 @@
+# scripts/replay_api_events.py
+# API Gateway 이벤트(JSON)를 src/router.py에 그대로 넣어 로컬에서 재생합니다.
+#   python scripts/replay_api_events.py events/                 # 디렉터리의 모든 이벤트
+#   python scripts/replay_api_events.py events/start_tq.json
+#   python scripts/replay_api_events.py --method GET --path /packages --api-key adm-12345678
+# 로컬 DynamoDB를 쓰려면 AWS_ENDPOINT_URL=http://localhost:8000 을 지정하세요.
+import os
+import sys
+import json
+import uuid
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+class Context:
+    def __init__(self):
+        self.aws_request_id = str(uuid.uuid4())
+        self.function_name = 'RouterFunction'
+
+def load_events(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith('.json'):
+                    yield from load_events([os.path.join(path, name)])
+        else:
+            with open(path, encoding='utf-8') as f:
+                yield path, json.load(f)
+
+def build_event(args):
+    query = dict(q.split('=', 1) for q in args.query) if args.query else None
+    return {
+        'httpMethod': args.method.upper(),
+        'path': args.path.split('?')[0],
+        'headers': {'X-Api-Key': args.api_key} if args.api_key else None,
+        'queryStringParameters': query,
+        'pathParameters': None,
+        'body': args.body
+    }
+
+def replay(name, event):
+    import router
+    start = time.perf_counter()
+    response = router.lambda_handler(event, Context())
+    elapsed = (time.perf_counter() - start) * 1000
+    body = response.get('body') or ''
+    print(f"[{response['statusCode']}] {event.get('httpMethod')} {event.get('path')} ({elapsed:.1f} ms) <- {name}")
+    print(f"    {body[:300]}")
+    return response
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('events', nargs='*', help='event JSON files or directories')
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--path')
+    parser.add_argument('--query', action='append', help='key=value (repeatable)')
+    parser.add_argument('--body')
+    parser.add_argument('--api-key', help='sent as the X-Api-Key header')
+    args = parser.parse_args()
+
+    if args.path:
+        replay('cli', build_event(args))
+    for name, event in load_events(args.events):
+        replay(name, event)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+# scripts/replay_projection_stream.py
+# data/*.csv 행을 DynamoDB Streams INSERT 레코드로 만들어 src/projection_consumer.py에 넣고,
+# 만들어진 Projections 값을 CSV에서 직접 센 값과 비교합니다.
+#   python scripts/replay_projection_stream.py --endpoint http://localhost:8000 --create-table
+#   python scripts/replay_projection_stream.py --source tables     # 실제 테이블을 scan해서 projection 초기 구축
+# eventID가 행마다 고정이라 여러 번 돌려도 중복 집계되지 않습니다.
+import os
+import sys
+import csv
+import argparse
+from collections import Counter, defaultdict
+import boto3
+from boto3.dynamodb.types import TypeSerializer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+from batch_load import cast_value
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+REGION = 'us-east-2'
+SOURCES = {
+    # table -> primary key attributes
+    'Packages': ('package_id',),
+    'StoringOrders': ('storing_order_id',),
+    'PickOrders': ('pick_order_id',),
+    'PickSlips': ('pick_slip_id',),
+    'Inventory': ('bin_id', 'product_id'),
+    'Bins': ('bin_id',),
+}
+
+def csv_items(table_name):
+    path = os.path.join(DATA_DIR, f'{table_name}.csv')
+    seen = set()
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            item = {k: cast_value(k, v) for k, v in row.items() if k is not None and cast_value(k, v) is not None}
+            key = tuple(item.get(k) for k in SOURCES[table_name])
+            # batch_load과 같이 중복 키는 첫 행만 사용
+            if None in key or key in seen:
+                continue
+            seen.add(key)
+            yield item
+
+def table_items(table_name, endpoint_url=None):
+    table = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url).Table(table_name)
+    scan_kwargs = {}
+    while True:
+        response = table.scan(**scan_kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def insert_records(table_name, items):
+    serializer = TypeSerializer()
+    for n, item in enumerate(items):
+        key = '|'.join(str(item[k]) for k in SOURCES[table_name])
+        yield {
+            'eventID': f'replay-{table_name}-{key}',
+            'eventName': 'INSERT',
+            'eventSourceARN': f'arn:aws:dynamodb:{REGION}:000000000000:table/{table_name}/stream/replay',
+            'dynamodb': {
+                'Keys': {k: serializer.serialize(item[k]) for k in SOURCES[table_name]},
+                'NewImage': {k: serializer.serialize(v) for k, v in item.items()},
+                'SequenceNumber': str(n + 1).zfill(21),
+                'StreamViewType': 'NEW_AND_OLD_IMAGES'
+            }
+        }
+
+def create_projections_table(endpoint_url):
+    dynamodb = boto3.resource('dynamodb', region_name=REGION, endpoint_url=endpoint_url)
+    name = os.environ['PROJECTIONS_TABLE']
+    try:
+        dynamodb.create_table(
+            TableName=name,
+            BillingMode='PAY_PER_REQUEST',
+            AttributeDefinitions=[
+                {'AttributeName': 'projection', 'AttributeType': 'S'},
+                {'AttributeName': 'key', 'AttributeType': 'S'},
+            ],
+            KeySchema=[
+                {'AttributeName': 'projection', 'KeyType': 'HASH'},
+                {'AttributeName': 'key', 'KeyType': 'RANGE'},
+            ],
+        ).wait_until_exists()
+        print(f"> Created table {name}")
+    except dynamodb.meta.client.exceptions.ResourceInUseException:
+        pass
+
+def expected_values(items_by_table):
+    from common.projections import STATUS_FIELDS
+    expected = {}
+    for table_name, field in STATUS_FIELDS.items():
+        expected[table_name] = Counter(i[field] for i in items_by_table.get(table_name, []) if i.get(field))
+    on_hand = defaultdict(int)
+    for item in items_by_table.get('Inventory', []):
+        on_hand[item['product_id']] += int(item.get('quantity') or 0)
+    expected['on-hand'] = {k: v for k, v in on_hand.items() if v}
+    return expected
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--endpoint', help='DynamoDB endpoint, e.g. http://localhost:8000 (DynamoDB Local)')
+    parser.add_argument('--source', choices=['csv', 'tables'], default='csv')
+    parser.add_argument('--batch', type=int, default=100, help='records per consumer invocation')
+    parser.add_argument('--create-table', action='store_true', help='create the Projections table if missing')
+    args = parser.parse_args()
+
+    os.environ.setdefault('AWS_DEFAULT_REGION', REGION)
+    os.environ.setdefault('PROJECTIONS_TABLE', 'Projections')
+    if args.endpoint:
+        os.environ['AWS_ENDPOINT_URL'] = args.endpoint
+    if args.create_table:
+        create_projections_table(args.endpoint)
+
+    import projection_consumer
+    from common.projections import status_counts, query_projection, ON_HAND
+
+    items_by_table = {}
+    for table_name in SOURCES:
+        if args.source == 'csv':
+            items = list(csv_items(table_name))
+        else:
+            items = list(table_items(table_name, args.endpoint))
+        items_by_table[table_name] = items
+        records = list(insert_records(table_name, items))
+        for i in range(0, len(records), args.batch):
+            result = projection_consumer.lambda_handler({'Records': records[i:i + args.batch]}, None)
+            if result['batchItemFailures']:
+                print(f"  ! {table_name}: failed at {result['batchItemFailures']}")
+        print(f"> {table_name}: replayed {len(records)} records")
+
+    expected = expected_values(items_by_table)
+    ok = True
+    for table_name in ('Packages', 'StoringOrders', 'PickOrders', 'PickSlips'):
+        actual = status_counts(table_name)
+        match = actual == dict(expected[table_name])
+        ok = ok and match
+        print(f"{table_name:<14} {'OK ' if match else 'DIFF'} {actual}")
+    on_hand = {item['key']: int(item['quantity']) for item in query_projection(ON_HAND) if item.get('quantity')}
+    match = on_hand == expected['on-hand']
+    ok = ok and match
+    print(f"{'on-hand':<14} {'OK ' if match else 'DIFF'} {len(on_hand)} products, {sum(on_hand.values())} units")
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -2,21 +2,44 @@ import json
 import random
 import datetime
 from common.utils import packages_table, items_table, bins_table, products_table, respond
-import os
-import boto3
+from common.bin_capacity import plan_allocation, reservation_update
+from common.bulk import update_status_many
+from common import clients
+from common.auth import resolve_identity
+from common.transitions import transact, TransitionConflict
 
-dynamodb = boto3.resource('dynamodb')
+MAX_RESERVATION_ATTEMPTS = 3
+MAX_TRANSACTION_ITEMS = 100
+
+def reserve_bins(plan, product_volume, package_id, employee_id, bin_allocation, now):
+    """Reserve volume in every planned bin and move the package to READY-FOR-BINNING atomically."""
+    transact_items = []
+    for bin_item, allocated_qty in plan:
+        transact_items.append({'Update': {
+            'TableName': bins_table.name,
+            'Key': {'bin_id': bin_item['bin_id']},
+            **reservation_update(bin_item, allocated_qty * product_volume)
+        }})
+    # bin_current/binned_count start empty; bin_rfid_consumer counts into them
+    transact(
+        [('package', 'allocate_bins', package_id, {'sets': {
+            'bin_allocation': bin_allocation,
+            'bin_current': {},
+            'binned_count': 0,
+            'binner_id': employee_id,
+            'bin_allocation_date': now
+        }})],
+        extra_items=transact_items
+    )
 
 def lambda_handler(event, context):
     if event.get('httpMethod', 'POST') == 'GET':
         params = event.get('queryStringParameters') or {}
-        role = params.get('role')
-        employee_id = params.get('employee_id')
+        role, employee_id = resolve_identity(event, params)
         body = params
     else:
         body = json.loads(event.get('body', '{}'))
-        role = body.get('role')
-        employee_id = body.get('employee_id')
+        role, employee_id = resolve_identity(event, body)
     if role != 'binner':
         return respond(403, {'message': 'Unauthorized. (role != binner)'})
     if not employee_id:
@@ -60,7 +83,7 @@ def lambda_handler(event, context):
     # 4. Status Check
     if status != 'READY-FOR-BIN-ALLOCATION':
         print(f"Status Error: current status={status}")
-        return respond(400, {'message': f"Package status is not READY-FOR-BIN-ALLOCATION. (Current status: {status})"})
+        return respond(409, {'message': f"Package status is not READY-FOR-BIN-ALLOCATION. (Current status: {status})"})
 
     # 5. Space Availability Check
     if quantity is None:
@@ -68,68 +91,46 @@ def lambda_handler(event, context):
         return respond(400, {'message': 'Package quantity information is missing.'})
 
     # 6. BIN Allocation
-    bins_response = bins_table.scan()
-    bins = bins_response.get('Items', [])
-    bins.sort(key=lambda x: x.get('availability_vol', 0), reverse=True)
-    bin_allocation = {}
-    remaining_quantity = int(quantity)
-    # Check if entire quantity can fit in a single bin
-    for bin in bins:
-        if bin.get('availability_vol', 0) >= total_volume:
-            bin_id = bin['bin_id']
-            bin_allocation = {bin_id: remaining_quantity}
-            print(f"Single BIN Allocation: bin_id={bin_id}, quantity={remaining_quantity}")
-            remaining_quantity = 0
+    # Plan against the capacity index, then commit every bin reservation and the
+    # package transition in one transaction. A bin whose availability_vol
+    # changed since the index read fails its condition and the plan is rebuilt
+    # without it (the index may still show the old value).
+    now = datetime.datetime.utcnow().isoformat()
+    stale_bins = set()
+    for attempt in range(1, MAX_RESERVATION_ATTEMPTS + 1):
+        plan = plan_allocation(bins_table, quantity, product_volume, exclude=stale_bins)
+        if plan is None:
+            print(f"Insufficient Space: quantity={quantity}, total_volume={total_volume}")
+            return respond(400, {'message': 'Not enough space for bin allocation.'})
+        if len(plan) >= MAX_TRANSACTION_ITEMS:
+            print(f"Allocation spans too many bins: {len(plan)}")
+            return respond(400, {'message': 'Not enough space for bin allocation.'})
+        bin_allocation = {bin_item['bin_id']: units for bin_item, units in plan}
+        print(f"BIN Allocation Plan (attempt {attempt}): {bin_allocation}")
+        try:
+            reserve_bins(plan, product_volume, package_id, employee_id, bin_allocation, now)
             break
+        except TransitionConflict as e:
+            print(f"Reservation cancelled: {e}")
+            return respond(409, {'message': f'Package status changed during bin allocation. {e}'})
+        except clients.client('dynamodb').exceptions.TransactionCanceledException as e:
+            reasons = [r.get('Code') for r in e.response.get('CancellationReasons', [])]
+            print(f"Reservation cancelled: {reasons}")
+            # Bin updates come first in the transaction, in plan order
+            stale_bins.update(bin_item['bin_id'] for (bin_item, _), code in zip(plan, reasons)
+                              if code == 'ConditionalCheckFailed')
     else:
-        print("Starting Distribution Across Multiple BINs")
-        # Distribute across multiple bins
-        for bin in bins:
-            if remaining_quantity <= 0:
-                break
-            bin_id = bin['bin_id']
-            bin_volume = bin.get('availability_vol', 0)
-            max_items = min(remaining_quantity, int(bin_volume / product_volume))
-            if max_items > 0:
-                bin_allocation[bin_id] = max_items
-                remaining_quantity -= max_items
-    if remaining_quantity > 0:
-        print(f"Insufficient Space: remaining_quantity={remaining_quantity}")
-        return respond(400, {'message': 'Not enough space for bin allocation.'})
-    
-    bin_allocation_str = json.dumps(bin_allocation)
-    now = datetime.datetime.utcnow().isoformat()
-    # Update availability_vol for each BIN
-    for bin_id, allocated_qty in bin_allocation.items():
-        used_volume = allocated_qty * product_volume
-        bins_table.update_item(
-            Key={'bin_id': bin_id},
-            UpdateExpression="SET availability_vol = availability_vol - :used",
-            ExpressionAttributeValues={':used': used_volume}
-        )
-
-    # Update Package Table
-    packages_table.update_item(
-        Key={'package_id': package_id},
-        UpdateExpression="SET bin_allocation=:ba, binner_id=:bid, bin_allocation_date=:dt, #s=:s",
-        ExpressionAttributeNames={'#s': 'status'},
-        ExpressionAttributeValues={
-            ':ba': bin_allocation_str,
-            ':bid': employee_id,
-            ':dt': now,
-            ':s': 'READY-FOR-BINNING'
-        }
-    )
+        return respond(409, {'message': 'Bin availability changed concurrently. Please retry.'})
 
     # 7. Update Items Table Status for Each RFID
+    # The package is already committed; tags that still failed after the bulk
+    # retries are returned so the client can re-run them (the update is idempotent).
     print(f"Updating RFID Status... (Total: {len(rfid_ids)})")
-    for rfid_id in rfid_ids:
-        items_table.update_item(
-            Key={'rfid_id': rfid_id},
-            UpdateExpression="SET #s=:s",
-            ExpressionAttributeNames={'#s': 'status'},
-            ExpressionAttributeValues={':s': 'READY-FOR-BINNING'}
-        )
+    failed = update_status_many(items_table, 'rfid_id', rfid_ids, 'READY-FOR-BINNING')
 
     print("=== Bin Allocation Lambda Completed ===")
-    return respond(200, {'message': 'Bin allocation completed', 'bin_allocation': bin_allocation})
+    response_body = {'message': 'Bin allocation completed', 'bin_allocation': bin_allocation}
+    if failed:
+        response_body['message'] = f'Bin allocation completed; {len(failed)} RFID item(s) could not be updated.'
+        response_body['failed_rfid_ids'] = [rfid_id for rfid_id, _ in failed]
+    return respond(200, response_body)
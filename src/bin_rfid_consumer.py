@@ -1,104 +1,164 @@
-import boto3
 import json
-import os
+from collections import Counter, defaultdict
+from common import clients
+from boto3.dynamodb.types import TypeDeserializer
+from common.transitions import update_request, transition, TransitionConflict
+from common.bin_maps import parse_bin_map
 
-dynamodb = boto3.resource('dynamodb')
-items_table = dynamodb.Table(os.environ['ITEMS_TABLE'])
-packages_table = dynamodb.Table(os.environ['PACKAGES_TABLE'])
+items_table = clients.LazyTable('ITEMS_TABLE')
+packages_table = clients.LazyTable('PACKAGES_TABLE')
+_deserializer = TypeDeserializer()
 
-def lambda_handler(event, context):
-    print("Lambda function has started.")
-    print(f"Received event: {event}")
-    
-    for record in event['Records']:
-        print(f"Processing record: {record}")
-        body = json.loads(record['body'])
-        rfid_id = body['rfid_id']
-        bin_id = body['bin_id']
-        binned_date = body['binned_date']
-        package_id = body['package_id']
-        print(f"RFID ID: {rfid_id}, Bin ID: {bin_id}, Binned Date: {binned_date}, Package ID: {package_id}")
-        
-        # 1. Query Packages table with package_id
-        package_resp = packages_table.get_item(Key={'package_id': package_id}, ConsistentRead=True)
-        package = package_resp.get('Item')
-        if not package:
-            print(f"Package {package_id} not found.")
-            continue
-        
-        # 2. bin_current and bin_allocation (e.g., "{""BIN1"":1,""BIN2"":2}")
-        bin_current = package.get('bin_current')
-        # Handle bin_current safely as it can be None, empty string, dict, str, etc.
-        if not bin_current or bin_current == "{}":
-            bin_current = {}
-        elif isinstance(bin_current, str):
-            try:
-                bin_current = json.loads(bin_current)
-            except Exception as e:
-                print(f"bin_current parsing error: {e}")
-                bin_current = {}
-        if not isinstance(bin_current, dict):
-            print(f"bin_current is not a dict type: {bin_current}")
-            bin_current = {}
-        # Convert value to int if it's a string
-        for k, v in bin_current.items():
-            if not isinstance(v, int):
-                try:
-                    bin_current[k] = int(v)
-                except Exception as e:
-                    print(f"bin_current value conversion error: {e}")
-                    bin_current[k] = 0
+class LegacyBinMap(Exception):
+    """bin_current is still a JSON string that could not be migrated in place."""
 
-        bin_allocation = package.get('bin_allocation')
-        if not bin_allocation or bin_allocation == "{}":
-            print(f"Package {package_id} has no bin_allocation.")
-            continue
-        if isinstance(bin_allocation, str):
-            try:
-                bin_allocation = json.loads(bin_allocation)
-            except Exception as e:
-                print(f"bin_allocation parsing error: {e}")
-                continue
-        if not isinstance(bin_allocation, dict):
-            print(f"bin_allocation is not a dict type: {bin_allocation}")
-            continue
-        for k, v in bin_allocation.items():
-            if not isinstance(v, int):
-                try:
-                    bin_allocation[k] = int(v)
-                except Exception as e:
-                    print(f"bin_allocation value conversion error: {e}")
-                    bin_allocation[k] = 0
+def conditional_check_failed():
+    return clients.client('dynamodb').exceptions.ConditionalCheckFailedException
 
-        bin_current[bin_id] = bin_current.get(bin_id, 0) + 1
-        
-        # 3. Determine status
-        if bin_current == bin_allocation:
-            new_status = 'BINNED'
+def claim_tag(scan):
+    """
+    Mark the tag BINNED in Items. Returns the row it replaced ({} if none),
+    or None if the tag was already binned, so a redelivered message or a
+    re-read tag is never counted twice.
+    """
+    try:
+        response = items_table.put_item(
+            Item={**scan, 'status': 'BINNED'},
+            ConditionExpression="attribute_not_exists(rfid_id) OR #s <> :binned",
+            ExpressionAttributeNames={'#s': 'status'},
+            ExpressionAttributeValues={':binned': 'BINNED'},
+            ReturnValues='ALL_OLD'
+        )
+    except conditional_check_failed():
+        return None
+    return response.get('Attributes', {})
+
+def release_tag(scan, previous):
+    """Undo claim_tag for a scan whose count was not applied (its redelivery claims it again)."""
+    kwargs = {
+        'ConditionExpression': "#s = :binned AND package_id = :p AND binned_date = :d",
+        'ExpressionAttributeNames': {'#s': 'status'},
+        'ExpressionAttributeValues': {':binned': 'BINNED', ':p': scan['package_id'], ':d': scan['binned_date']}
+    }
+    try:
+        if previous:
+            items_table.put_item(Item=previous, **kwargs)
         else:
-            new_status = 'BINNING'
-        
-        # Convert bin_current to string
-        bin_current_str = json.dumps(bin_current)
+            items_table.delete_item(Key={'rfid_id': scan['rfid_id']}, **kwargs)
+    except conditional_check_failed():
+        pass
+    except Exception as e:
+        print(f"Could not release RFID {scan['rfid_id']}: {e}")
 
-        # 4. Update Packages table
+def migrate_bin_current(package_id, package):
+    """Convert a legacy JSON-string bin_current to a map (and fill binned_count), guarded on what was read."""
+    bin_current = parse_bin_map(package.get('bin_current'))
+    if 'bin_current' in package:
+        condition, values = "bin_current = :old", {':old': package['bin_current']}
+    else:
+        condition, values = "attribute_not_exists(bin_current)", {}
+    try:
         packages_table.update_item(
             Key={'package_id': package_id},
-            UpdateExpression="SET bin_current = :bc, #s = :s",
-            ExpressionAttributeNames={'#s': 'status'},
-            ExpressionAttributeValues={':bc': bin_current_str, ':s': new_status}
+            UpdateExpression="SET bin_current = :bc, binned_count = :n",
+            ConditionExpression=condition,
+            ExpressionAttributeValues={':bc': bin_current, ':n': sum(bin_current.values()), **values}
         )
-        print(f"Updated package {package_id}'s bin_current to {bin_current} and status to {new_status}.")
-        
-        # Add additional fields if needed
-        items_table.put_item(Item={
-            'rfid_id': rfid_id,
-            'package_id': package_id,
-            'status': 'BINNED',
-            'bin_id': bin_id,
-            'binned_date': binned_date
-        })
-        print(f"Item saved to DynamoDB: {rfid_id}")
-    
-    print("All records processing completed.")
-    return {"statusCode": 200}
+        print(f"Package {package_id}: migrated legacy bin_current {package.get('bin_current')!r}")
+    except conditional_check_failed():
+        pass
+
+def count_scans(package_id, scans, migrate=True):
+    """
+    Add this batch's newly claimed tags to bin_current.<bin_id> and
+    binned_count in one atomic update. Returns the new binned_count, or None
+    if the package is not being binned. A legacy string bin_current is
+    migrated once and retried; LegacyBinMap if it still is not a map.
+    """
+    names, values, sets = {}, {':zero': 0, ':map': 'M'}, []
+    for i, (bin_id, count) in enumerate(Counter(scan['bin_id'] for scan in scans.values()).items()):
+        names[f'#b{i}'] = bin_id
+        values[f':c{i}'] = count
+        # ADD only works on top-level attributes, so nested counters use SET
+        sets.append(f"bin_current.#b{i} = if_not_exists(bin_current.#b{i}, :zero) + :c{i}")
+    request = update_request('package', 'bin_scan', package_id, set_clauses=sets, adds={'binned_count': len(scans)},
+                             condition="attribute_type(bin_current, :map)", names=names, values=values)
+    try:
+        response = clients.client('dynamodb').update_item(ReturnValues='UPDATED_NEW', **request)
+    except conditional_check_failed() as e:
+        package = {k: _deserializer.deserialize(v) for k, v in (e.response.get('Item') or {}).items()}
+        if package.get('status') not in ('READY-FOR-BINNING', 'BINNING'):
+            return None
+        if not migrate:
+            raise LegacyBinMap(f"Package {package_id} bin_current is {package.get('bin_current')!r}, not a map")
+        migrate_bin_current(package_id, package)
+        return count_scans(package_id, scans, migrate=False)
+    return response['Attributes']['binned_count']
+
+def complete_if_binned(package_id):
+    """Move the package to BINNED once every allocated unit has been scanned."""
+    try:
+        transition('package', 'bin_complete', package_id, condition="binned_count = quantity")
+        return True
+    except TransitionConflict:
+        return False
+
+def lambda_handler(event, context):
+    print("Lambda function has started.")
+    records = event.get('Records', [])
+    print(f"Received {len(records)} records.")
+
+    failures = []
+    # package_id -> {rfid_id: scan}; a tag read twice in one batch counts once
+    scans_by_package = defaultdict(dict)
+    messages_by_package = defaultdict(list)
+    for record in records:
+        try:
+            body = json.loads(record['body'])
+            scan = {
+                'rfid_id': body['rfid_id'],
+                'bin_id': body['bin_id'],
+                'binned_date': body['binned_date'],
+                'package_id': body['package_id']
+            }
+        except Exception as e:
+            print(f"Skipping malformed record {record.get('messageId')}: {e}")
+            continue
+        scans_by_package[scan['package_id']][scan['rfid_id']] = scan
+        messages_by_package[scan['package_id']].append(record['messageId'])
+
+    for package_id, scans in scans_by_package.items():
+        claimed = {}
+        counted = False
+        try:
+            # 1. Claim each tag in Items; already-binned tags (redelivery, re-read) are skipped
+            for rfid_id, scan in scans.items():
+                previous = claim_tag(scan)
+                if previous is None:
+                    print(f"RFID {rfid_id} already binned, skipping.")
+                else:
+                    claimed[rfid_id] = previous
+
+            # 2. Count only the newly claimed tags
+            if claimed:
+                binned = count_scans(package_id, {rfid_id: scans[rfid_id] for rfid_id in claimed})
+                if binned is None:
+                    print(f"Package {package_id} not found or not in binning.")
+                    for rfid_id, previous in claimed.items():
+                        release_tag(scans[rfid_id], previous)
+                    continue
+                counted = True
+                print(f"Package {package_id}: binned_count={binned}")
+
+            # 3. Completion also runs for a redelivery whose count already landed
+            if complete_if_binned(package_id):
+                print(f"Package {package_id} is now BINNED.")
+        except Exception as e:
+            print(f"Package {package_id} update failed: {e}")
+            if not counted:
+                for rfid_id, previous in claimed.items():
+                    release_tag(scans[rfid_id], previous)
+            failures.extend(messages_by_package[package_id])
+
+    print(f"All records processing completed. Failed: {len(failures)}")
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failures]}
@@ -1,24 +1,46 @@
 import json
-import os
-import boto3
 from datetime import datetime
+from common import clients
+from common.auth import resolve_identity
+from common.bin_maps import parse_bin_map
+from common.transitions import transact, TransitionConflict
 
-dynamodb = boto3.resource('dynamodb')
-packages_table_name = os.environ.get('PACKAGES_TABLE')
-packages_table = dynamodb.Table(packages_table_name)
+packages_table = clients.LazyTable('PACKAGES_TABLE')
+inventory_table = clients.LazyTable('INVENTORY_TABLE')
+MAX_TRANSACTION_ITEMS = 100
+
+def post_inventory(package, bin_allocation, timestamp):
+    """
+    ADD each allocated quantity to Inventory and mark the package BINNED in one
+    transaction. binned_date is only set here, so a retried close fails the
+    package condition instead of posting the stock twice.
+    """
+    package_id = package['package_id']
+    transact_items = [{'Update': {
+        'TableName': inventory_table.name,
+        'Key': {'bin_id': bin_id, 'product_id': package['product_id']},
+        'UpdateExpression': "ADD quantity :q",
+        'ExpressionAttributeValues': {':q': qty}
+    }} for bin_id, qty in bin_allocation.items() if qty > 0]
+    transact(
+        [('package', 'close_binning', package_id, {
+            'sets': {'binned_date': timestamp},
+            'condition': "attribute_not_exists(binned_date) AND bin_allocation = :ba",
+            'values': {':ba': package['bin_allocation']}
+        })],
+        extra_items=transact_items
+    )
 
 def lambda_handler(event, context):
     print(f"Lambda function started - Event: {json.dumps(event)}")
     try:
         if event.get('httpMethod', 'POST') == 'GET':
             params = event.get('queryStringParameters') or {}
-            role = params.get('role')
-            employee_id = params.get('employee_id')
+            role, employee_id = resolve_identity(event, params)
             path_params = event.get('pathParameters', {})
         else:
             body = json.loads(event.get('body', '{}'))
-            role = body.get('role')
-            employee_id = body.get('employee_id')
+            role, employee_id = resolve_identity(event, body)
             path_params = event.get('pathParameters', {})
         if role != 'binner':
             return {
@@ -45,61 +67,40 @@ def lambda_handler(event, context):
         print(f"Package {package_id} found, updating status to BINNED")
         # bin_allocation, product_id 읽기
         package_item = item_response['Item']
-        bin_allocation_str = package_item.get('bin_allocation')
+        bin_allocation = parse_bin_map(package_item.get('bin_allocation'))
         product_id = package_item.get('product_id')
-        if not bin_allocation_str or not product_id:
+        if not bin_allocation or not product_id:
             return {
                 'statusCode': 400,
                 'body': json.dumps({'message': 'Bad Request: bin_allocation or product_id missing in package.'})
             }
-        try:
-            bin_allocation = json.loads(bin_allocation_str.replace("'", '"')) if isinstance(bin_allocation_str, str) else bin_allocation_str
-        except Exception as e:
-            print(f"bin_allocation 파싱 오류: {e}")
+        if len(bin_allocation) >= MAX_TRANSACTION_ITEMS:
             return {
                 'statusCode': 400,
-                'body': json.dumps({'message': 'Bad Request: bin_allocation parsing error.'})
+                'body': json.dumps({'message': 'Bad Request: bin_allocation spans too many bins.'})
             }
-        # inventory 테이블 업데이트
-        inventory_table_name = os.environ.get('INVENTORY_TABLE')
-        inventory_table = dynamodb.Table(inventory_table_name)
-        for bin_id, qty in bin_allocation.items():
-            if not isinstance(qty, int):
-                try:
-                    qty = int(qty)
-                except:
-                    continue
-            # 기존 레코드 조회
-            inv_resp = inventory_table.get_item(Key={'bin_id': bin_id, 'product_id': product_id}, ConsistentRead=True)
-            if 'Item' in inv_resp:
-                # 기존 quantity에 더하기
-                prev_qty = inv_resp['Item'].get('quantity', 0)
-                new_qty = prev_qty + qty
-                inventory_table.update_item(
-                    Key={'bin_id': bin_id, 'product_id': product_id},
-                    UpdateExpression="SET quantity = :q",
-                    ExpressionAttributeValues={':q': new_qty}
-                )
-                print(f"Updated inventory: bin_id={bin_id}, product_id={product_id}, quantity={prev_qty} -> {new_qty}")
-            else:
-                # 새로 생성
-                inventory_table.put_item(Item={
-                    'bin_id': bin_id,
-                    'product_id': product_id,
-                    'quantity': qty
-                })
-                print(f"Created inventory: bin_id={bin_id}, product_id={product_id}, quantity={qty}")
-        # 패키지 상태 업데이트
+        # inventory 반영 + 패키지 BINNED 전환을 한 트랜잭션으로 처리
         timestamp = datetime.now().isoformat()
-        packages_table.update_item(
-            Key={'package_id': package_id},
-            UpdateExpression="SET #status_attr = :status, binned_date = :date",
-            ExpressionAttributeNames={'#status_attr': 'status'},
-            ExpressionAttributeValues={
-                ':status': 'BINNED',
-                ':date': timestamp
+        try:
+            post_inventory(package_item, bin_allocation, timestamp)
+        except TransitionConflict as e:
+            print(f"Close binning cancelled: {e}")
+            current = packages_table.get_item(Key={'package_id': package_id}, ConsistentRead=True).get('Item') or {}
+            if current.get('status') == 'BINNED' and current.get('binned_date'):
+                # A retried close: stock was already posted by the first call
+                return {
+                    'statusCode': 200,
+                    'headers': {
+                        'Access-Control-Allow-Origin': '*',
+                        'Access-Control-Allow-Headers': 'Content-Type',
+                        'Access-Control-Allow-Methods': 'OPTIONS,POST'
+                    },
+                    'body': json.dumps({'message': f'Package {package_id} has already been binned.'})
+                }
+            return {
+                'statusCode': 409,
+                'body': json.dumps({'message': 'Conflict: Package was already closed or changed concurrently.'})
             }
-        )
         print(f"Successfully updated package {package_id} to BINNED status at {timestamp}")
 
         return {
@@ -1,33 +1,91 @@
 import json
-import os
-import boto3
+from boto3.dynamodb.conditions import Key
+from common import clients
 from datetime import datetime
-from decimal import Decimal
+from common.auth import resolve_identity
+from common.serialize import dumps
+from common.sharding import shard_set
+from common.bulk import _backoff
+from boto3.dynamodb.types import TypeDeserializer
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, Decimal):
-            return str(o)
-        return super(DecimalEncoder, self).default(o)
-
-dynamodb = boto3.resource('dynamodb')
-pick_orders_table_name = os.environ.get('PICK_ORDERS_TABLE')
-pick_slips_table_name = os.environ.get('PICK_SLIPS_TABLE')
-pick_orders_table = dynamodb.Table(pick_orders_table_name)
-pick_slips_table = dynamodb.Table(pick_slips_table_name)
+pick_orders_table = clients.LazyTable('PICK_ORDERS_TABLE')
+pick_slips_table = clients.LazyTable('PICK_SLIPS_TABLE')
 GSI_NAME = 'PickSlipIdIndex'
+CONFLICT_RESPONSE = {'statusCode': 409, 'body': json.dumps({'message': 'Conflict: Pick order was closed or reassigned concurrently.'})}
+BUSY_RESPONSE = {'statusCode': 503, 'body': json.dumps({'message': 'Pick slip is busy, please retry.'})}
+MAX_ATTEMPTS = 3
+# Cancellation reasons worth another attempt (concurrent closes on the same slip, throttling)
+RETRYABLE_REASONS = {'TransactionConflict', 'ThrottlingError', 'ProvisionedThroughputExceeded'}
+_deserializer = TypeDeserializer()
+
+def close_order_update(pick_order_id, employee_id, timestamp):
+    shard_clause, shard_values = shard_set('CLOSE', pick_order_id, timestamp)
+    return {
+        'TableName': pick_orders_table.name,
+        'Key': {'pick_order_id': pick_order_id},
+        'UpdateExpression': f"SET pick_order_status = :status, picked_date = :date, {shard_clause} REMOVE ready_picker_id",
+        'ConditionExpression': "pick_order_status = :ready AND picker_id = :picker",
+        'ExpressionAttributeValues': {':status': 'CLOSE', ':date': timestamp, ':ready': 'READY-FOR-PICKING', ':picker': employee_id, **shard_values}
+    }
+
+def close_with_counter(pick_order_id, pick_slip_id, employee_id, timestamp, last):
+    """
+    Close the order and count it off the slip in one transaction. `last`
+    picks the variant: open_order_count = 1 (this is the slip's last open
+    order) or open_order_count > 1, so exactly one closer sees the slip finish.
+    """
+    clients.client('dynamodb').transact_write_items(TransactItems=[
+        {'Update': close_order_update(pick_order_id, employee_id, timestamp)},
+        {'Update': {
+            'TableName': pick_slips_table.name,
+            'Key': {'pick_slip_id': pick_slip_id},
+            'UpdateExpression': "SET open_order_count = open_order_count - :one",
+            'ConditionExpression': "open_order_count = :one" if last else "open_order_count > :one",
+            'ExpressionAttributeValues': {':one': 1},
+            # The current counter decides the next variant (or "slip has no counter")
+            'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+        }}
+    ])
+
+def close_with_index(pick_order_id, pick_slip_id, employee_id, timestamp):
+    """Legacy path: close the order, then check its siblings through PickSlipIdIndex."""
+    clients.client('dynamodb').update_item(**close_order_update(pick_order_id, employee_id, timestamp))
+    query_kwargs = {
+        'IndexName': GSI_NAME,
+        'KeyConditionExpression': Key('pick_slip_id').eq(pick_slip_id),
+        'ProjectionExpression': 'pick_order_id, pick_order_status'
+    }
+    while True:
+        response = pick_orders_table.query(**query_kwargs)
+        for o in response.get('Items', []):
+            if o['pick_order_id'] != pick_order_id and o.get('pick_order_status') != 'CLOSE':
+                return False
+        if 'LastEvaluatedKey' not in response:
+            return True
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def mark_ready_for_packing(pick_slip_id, timestamp):
+    shard_clause, shard_values = shard_set('READY-FOR-PACKING', pick_slip_id, timestamp)
+    try:
+        pick_slips_table.update_item(
+            Key={'pick_slip_id': pick_slip_id},
+            UpdateExpression=f"SET pick_slip_status = :status, ready_for_packing_date = :date, ready_packing_zone = if_not_exists(packing_zone, :unassigned), {shard_clause}",
+            ConditionExpression="attribute_exists(pick_slip_id) AND pick_slip_status <> :status",
+            ExpressionAttributeValues={':status': 'READY-FOR-PACKING', ':date': timestamp, ':unassigned': 'UNASSIGNED', **shard_values}
+        )
+        return True
+    except clients.client('dynamodb').exceptions.ConditionalCheckFailedException:
+        return False
 
 def lambda_handler(event, context):
     try:
         if event.get('httpMethod', 'POST') == 'GET':
             params = event.get('queryStringParameters') or {}
-            role = params.get('role')
-            employee_id = params.get('employee_id')
+            role, employee_id = resolve_identity(event, params)
             path_params = event.get('pathParameters', {})
         else:
             body = json.loads(event.get('body', '{}'))
-            role = body.get('role')
-            employee_id = body.get('employee_id')
+            role, employee_id = resolve_identity(event, body)
             path_params = event.get('pathParameters', {})
         pick_order_id = path_params.get('pick_order_id')
         if not all([employee_id, role, pick_order_id]):
@@ -54,35 +112,49 @@ def lambda_handler(event, context):
         if order.get('pick_order_status') != 'READY-FOR-PICKING':
             return {'statusCode': 400, 'body': json.dumps({'message': f"Bad Request: Pick order status is '{order.get('pick_order_status')}', not 'READY-FOR-PICKING'."})}
 
-        # 2. Update the pick order status to CLOSE
+        # 2. Close the order and decrement the slip's open_order_count in one transaction
         timestamp = datetime.now().isoformat()
-        update_response = pick_orders_table.update_item(
-            Key={'pick_order_id': pick_order_id},
-            UpdateExpression="SET pick_order_status = :status, picked_date = :date",
-            ExpressionAttributeValues={':status': 'CLOSE', ':date': timestamp},
-            ReturnValues="ALL_NEW"
-        )
-        updated_order = update_response.get('Attributes', {})
-        pick_slip_id = updated_order.get('pick_slip_id')
-
-        # 3. Check if all orders for the same pick slip are closed
-        # Use scan for simplicity and to ensure data consistency after update
-        related_orders_response = pick_orders_table.scan(
-            FilterExpression=boto3.dynamodb.conditions.Attr('pick_slip_id').eq(pick_slip_id)
-        )
-        related_orders = related_orders_response.get('Items', [])
-        
-        all_closed = all(o.get('pick_order_status') == 'CLOSE' for o in related_orders)
+        pick_slip_id = order.get('pick_slip_id')
+        last = False
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                close_with_counter(pick_order_id, pick_slip_id, employee_id, timestamp, last)
+                slip_complete = last
+                break
+            except clients.client('dynamodb').exceptions.TransactionCanceledException as e:
+                reasons = e.response.get('CancellationReasons', [])
+                codes = [r.get('Code') for r in reasons]
+                print(f"Close {pick_order_id} cancelled (attempt {attempt + 1}): {codes}")
+                if codes and codes[0] == 'ConditionalCheckFailed':
+                    return CONFLICT_RESPONSE
+                if len(codes) > 1 and codes[1] == 'ConditionalCheckFailed':
+                    slip = reasons[1].get('Item') or {}
+                    if 'open_order_count' in slip:
+                        count = int(_deserializer.deserialize(slip['open_order_count']))
+                        if count < 1:
+                            # Counter already at 0: never close without counting off
+                            return {'statusCode': 409, 'body': json.dumps({'message': f"Conflict: Pick slip {pick_slip_id} has no open orders left."})}
+                        # Guessed the wrong variant; retry straight away with the right one
+                        last = count == 1
+                        continue
+                    # Slip without a counter (created before open_order_count existed)
+                    print(f"Falling back to {GSI_NAME} for pick slip {pick_slip_id}")
+                    try:
+                        slip_complete = close_with_index(pick_order_id, pick_slip_id, employee_id, timestamp)
+                    except clients.client('dynamodb').exceptions.ConditionalCheckFailedException:
+                        return CONFLICT_RESPONSE
+                    break
+                if not set(codes) & RETRYABLE_REASONS:
+                    raise
+                if attempt < MAX_ATTEMPTS - 1:
+                    _backoff(attempt)
+        else:
+            return BUSY_RESPONSE
 
         response_message = {'message': 'Pick order closed successfully.'}
 
-        # 4. If all are closed, update the pick slip status
-        if all_closed and related_orders:
-            pick_slips_table.update_item(
-                Key={'pick_slip_id': pick_slip_id},
-                UpdateExpression="SET pick_slip_status = :status, ready_for_packing_date = :date",
-                ExpressionAttributeValues={':status': 'READY-FOR-PACKING', ':date': timestamp}
-            )
+        # 3. If all are closed, update the pick slip status
+        if slip_complete and mark_ready_for_packing(pick_slip_id, timestamp):
             response_message['pick_slip_status'] = 'READY-FOR-PACKING'
 
         return {
@@ -92,7 +164,7 @@ def lambda_handler(event, context):
                 'Access-Control-Allow-Headers': 'Content-Type',
                 'Access-Control-Allow-Methods': 'OPTIONS,POST'
             },
-            'body': json.dumps(response_message, cls=DecimalEncoder)
+            'body': dumps(response_message)
         }
 
     except Exception as e:
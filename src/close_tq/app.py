@@ -1,20 +1,20 @@
 import json
 from datetime import datetime
-from common.utils import packages_table, respond
+from common.utils import respond
+from common.auth import resolve_identity
+from common.transitions import transition, TransitionConflict
 
 def lambda_handler(event, context):
     try:
         if event.get('httpMethod', 'POST') == 'GET':
             params = event.get('queryStringParameters') or {}
-            role = params.get('role')
-            employee_id = params.get('employee_id')
+            role, employee_id = resolve_identity(event, params)
             path_params = event.get('pathParameters', {})
             flag = params.get('flag')
             description = params.get('description', '')
         else:
             body = json.loads(event.get('body', '{}'))
-            role = body.get('role')
-            employee_id = body.get('employee_id')
+            role, employee_id = resolve_identity(event, body)
             path_params = event.get('pathParameters', {})
             flag = body.get('flag')
             description = body.get('description', '')
@@ -24,32 +24,20 @@ def lambda_handler(event, context):
         if role != 'tq_employee':
             return respond(403, {'message': f"Forbidden: Role '{role}' is not authorized."})
 
-        # 1. Fetch the package and check its status
-        package_response = packages_table.get_item(Key={'package_id': package_id}, ConsistentRead=True)
-        package = package_response.get('Item')
-        if not package:
-            return respond(404, {'message': 'Package not found.'})
-
+        # Single conditional update: TQ-CHECKING, or READY-FOR-BIN-ALLOCATION once every tag was scanned
         timestamp = datetime.now().isoformat()
-        if flag == 'fail':
-            update_expr = "SET #s = :status, tq_fail_description = :desc, tq_close_date = :close_date, tq_date = :tq_date"
-            expr_attr_names = {'#s': 'status'}
-            expr_attr_values = {':status': 'TQ-QUALITY-CHECK-FAILED', ':desc': description, ':close_date': timestamp, ':tq_date': timestamp}
-            packages_table.update_item(
-                Key={'package_id': package_id},
-                UpdateExpression=update_expr,
-                ExpressionAttributeNames=expr_attr_names,
-                ExpressionAttributeValues=expr_attr_values
-            )
-            return respond(200, {'message': f'Package {package_id} is now TQ-QUALITY-CHECK-FAILED.'})
-        else:
-            packages_table.update_item(
-                Key={'package_id': package_id},
-                UpdateExpression="SET #s = :status, ready_for_bin_allocation_date = :date, tq_date = :tq_date",
-                ExpressionAttributeNames={'#s': 'status'},
-                ExpressionAttributeValues={':status': 'READY-FOR-BIN-ALLOCATION', ':date': timestamp, ':tq_date': timestamp}
-            )
+        try:
+            if flag == 'fail':
+                transition('package', 'close_tq_fail', package_id, sets={
+                    'tq_fail_description': description, 'tq_close_date': timestamp, 'tq_date': timestamp
+                })
+                return respond(200, {'message': f'Package {package_id} is now TQ-QUALITY-CHECK-FAILED.'})
+            transition('package', 'close_tq_pass', package_id, sets={
+                'ready_for_bin_allocation_date': timestamp, 'tq_date': timestamp
+            })
             return respond(200, {'message': f'Package {package_id} is now READY-FOR-BIN-ALLOCATION.'})
+        except TransitionConflict as e:
+            return respond(404 if e.not_found else 409, {'message': str(e)})
 
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,71 @@
+import os
+from common.cache import TTLCache
+from common.clients import LazyTable
+
+# ApiKeys lookups are cached per container: hits for API_KEY_CACHE_TTL
+# seconds, unknown keys for the shorter API_KEY_NEGATIVE_TTL so a freshly
+# seeded key starts working quickly. invalidate_api_key() drops entries
+# explicitly (e.g. after revoking a key).
+API_KEY_CACHE_TTL = float(os.environ.get('API_KEY_CACHE_TTL', '300'))
+API_KEY_NEGATIVE_TTL = float(os.environ.get('API_KEY_NEGATIVE_TTL', '30'))
+API_KEY_CACHE_SIZE = int(os.environ.get('API_KEY_CACHE_SIZE', '1024'))
+# Transitional switch for clients that do not send an API key yet. When
+# false (default) the role/employee_id in the request payload are ignored.
+ALLOW_PAYLOAD_ROLE = os.environ.get('ALLOW_PAYLOAD_ROLE', 'false').lower() == 'true'
+
+api_keys_table = LazyTable('API_KEYS_TABLE')
+
+
+_MISSING = object()
+_NOT_FOUND = object()
+_cache = TTLCache(API_KEY_CACHE_SIZE)
+
+
+def get_api_key_record(api_key):
+    """ApiKeys item for `api_key`, or None. Served from the cache when fresh."""
+    if not api_key:
+        return None
+    cached = _cache.get(api_key, _MISSING)
+    if cached is not _MISSING:
+        return None if cached is _NOT_FOUND else cached
+    record = api_keys_table.get_item(Key={'api_key': api_key}, ConsistentRead=True).get('Item')
+    if record:
+        _cache.put(api_key, record, API_KEY_CACHE_TTL)
+    else:
+        _cache.put(api_key, _NOT_FOUND, API_KEY_NEGATIVE_TTL)
+    return record
+
+
+def invalidate_api_key(api_key=None):
+    """Forget one cached key, or every cached key when called without one."""
+    _cache.invalidate(api_key)
+
+
+def api_key_from_event(event, payload=None):
+    for name, value in (event.get('headers') or {}).items():
+        if name.lower() == 'x-api-key' and value:
+            return value
+    params = event.get('queryStringParameters') or {}
+    if params.get('api_key'):
+        return params['api_key']
+    if isinstance(payload, dict) and payload.get('api_key'):
+        return payload['api_key']
+    return None
+
+
+def resolve_identity(event, payload=None):
+    """
+    (role, employee_id) of the caller, taken from their API key record.
+
+    Returns (None, None) for a missing or unknown key, which handlers turn
+    into their usual 401/403 responses.
+    """
+    api_key = api_key_from_event(event, payload)
+    if api_key:
+        record = get_api_key_record(api_key)
+        if not record:
+            return None, None
+        return record.get('role'), record.get('employee_id')
+    if ALLOW_PAYLOAD_ROLE and isinstance(payload, dict):
+        return payload.get('role'), payload.get('employee_id')
+    return None, None
@@ -0,0 +1,110 @@
+import os
+import math
+from boto3.dynamodb.conditions import Key
+
+# Bins carry a power-of-two `capacity_bucket` next to `availability_vol`.
+# CapacityBucketIndex is sparse (full bins drop the attribute) and sorted by
+# availability_vol inside each bucket, so a best-fit lookup touches at most
+# MAX_BUCKET small queries instead of the whole Bins table.
+CAPACITY_INDEX = 'CapacityBucketIndex'
+MAX_BUCKET = int(os.environ.get('BIN_CAPACITY_MAX_BUCKET', '32'))
+PAGE_SIZE = 25
+
+
+def capacity_bucket(volume):
+    """Bucket number for an availability_vol, or None when the bin is full."""
+    # Round up: a fractional volume in (0, 1) still has space and lands in bucket 1
+    volume = math.ceil(volume or 0)
+    if volume <= 0:
+        return None
+    return min(volume.bit_length(), MAX_BUCKET)
+
+
+def _iter_bucket(table, bucket, min_volume=None, ascending=True):
+    condition = Key('capacity_bucket').eq(bucket)
+    if min_volume is not None:
+        condition = condition & Key('availability_vol').gte(min_volume)
+    query_kwargs = {
+        'IndexName': CAPACITY_INDEX,
+        'KeyConditionExpression': condition,
+        'ScanIndexForward': ascending,
+        'Limit': PAGE_SIZE
+    }
+    while True:
+        response = table.query(**query_kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def find_best_fit(table, volume, exclude=()):
+    """Smallest bin whose availability_vol is at least `volume`."""
+    for bucket in range(capacity_bucket(volume) or 1, MAX_BUCKET + 1):
+        for bin_item in _iter_bucket(table, bucket, min_volume=volume):
+            if bin_item['bin_id'] not in exclude:
+                return bin_item
+    return None
+
+
+def iter_largest_bins(table, exclude=()):
+    """Bins with free space, largest availability_vol first."""
+    for bucket in range(MAX_BUCKET, 0, -1):
+        for bin_item in _iter_bucket(table, bucket, ascending=False):
+            if bin_item['bin_id'] not in exclude:
+                yield bin_item
+
+
+def plan_allocation(table, quantity, product_volume, exclude=()):
+    """
+    Plan where `quantity` units of `product_volume` go.
+
+    Returns a list of (bin_item, units) using a single best-fit bin when one
+    exists, otherwise the fewest bins (largest first, with the remainder
+    placed in the smallest bin that still fits it). Returns None when the
+    warehouse does not have enough space.
+    """
+    quantity = int(quantity)
+    best = find_best_fit(table, product_volume * quantity, exclude)
+    if best:
+        return [(best, quantity)]
+
+    plan = []
+    used = set(exclude)
+    remaining = quantity
+    for bin_item in iter_largest_bins(table, exclude):
+        fits = int(bin_item['availability_vol'] / product_volume)
+        if fits <= 0:
+            # Bins are visited largest first, nothing further down fits a unit.
+            break
+        if fits >= remaining:
+            tail = find_best_fit(table, product_volume * remaining, used)
+            plan.append((tail or bin_item, remaining))
+            remaining = 0
+            break
+        plan.append((bin_item, fits))
+        used.add(bin_item['bin_id'])
+        remaining -= fits
+    return plan if remaining == 0 else None
+
+
+def reservation_update(bin_item, used_volume):
+    """
+    update_item arguments that take `used_volume` out of a planned bin and
+    re-bucket it. `bin_item` comes from the (eventually consistent) index,
+    so the write is guarded on availability_vol still being the value the
+    bucket was computed from; a bin that changed fails and is re-planned.
+    """
+    seen = bin_item['availability_vol']
+    bucket = capacity_bucket(seen - used_volume)
+    values = {':used': used_volume, ':seen': seen}
+    if bucket is None:
+        expression = "SET availability_vol = availability_vol - :used REMOVE capacity_bucket"
+    else:
+        expression = "SET availability_vol = availability_vol - :used, capacity_bucket = :bucket"
+        values[':bucket'] = bucket
+    return {
+        'UpdateExpression': expression,
+        'ConditionExpression': 'availability_vol = :seen AND availability_vol >= :used',
+        'ExpressionAttributeValues': values
+    }
@@ -0,0 +1,29 @@
+import json
+
+# Packages.bin_allocation / bin_current are DynamoDB maps of bin_id -> units.
+# Rows written before the map format held JSON strings (sometimes with single
+# quotes); parse_bin_map reads both so nothing breaks ahead of the migration
+# (scripts/migrate_bin_maps.py).
+
+
+def parse_bin_map(value):
+    """bin_id -> int for a map, a legacy JSON string or an empty value."""
+    if not value or value == "{}":
+        return {}
+    if isinstance(value, str):
+        try:
+            value = json.loads(value.replace("'", '"'))
+        except Exception as e:
+            print(f"bin map parsing error: {e}")
+            return {}
+    if not isinstance(value, dict):
+        print(f"bin map is not a dict type: {value}")
+        return {}
+    parsed = {}
+    for k, v in value.items():
+        try:
+            parsed[k] = int(v)
+        except Exception as e:
+            print(f"bin map value conversion error: {e}")
+            parsed[k] = 0
+    return parsed
@@ -0,0 +1,94 @@
+import os
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+
+# Worker threads share the table's low-level client (thread-safe, unlike the
+# resource objects), so keep the default at botocore's connection pool size.
+MAX_WORKERS = int(os.environ.get('BULK_MAX_WORKERS', '10'))
+MAX_ATTEMPTS = 5
+BATCH_WRITE_SIZE = 25
+RETRYABLE_ERRORS = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError'
+}
+
+
+def _backoff(attempt):
+    time.sleep(min(2.0, 0.05 * (2 ** attempt)) * random.random())
+
+
+def _update_with_retry(client, request):
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            client.update_item(**request)
+            return None
+        except ClientError as e:
+            code = e.response['Error']['Code']
+            if code not in RETRYABLE_ERRORS or attempt == MAX_ATTEMPTS - 1:
+                return code
+            _backoff(attempt)
+
+
+def run_updates(table, requests, max_workers=None):
+    """
+    Run prepared update_item requests (each with its own Key), at most
+    `max_workers` at a time. Returns a list of (Key, error_code) for failures.
+    """
+    if not requests:
+        return []
+    client = table.meta.client
+    workers = min(max_workers or MAX_WORKERS, len(requests))
+    requests = [dict(r, TableName=table.name) for r in requests]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda r: _update_with_retry(client, r), requests))
+    failed = [(r['Key'], code) for r, code in zip(requests, results) if code]
+    if failed:
+        print(f"Bulk update failed for {len(failed)}/{len(requests)} keys in {table.name}: {failed[:10]}")
+    return failed
+
+
+def update_many(table, key_name, key_values, update_kwargs, max_workers=None):
+    """
+    Apply the same update_item arguments to every key, at most `max_workers` at a time.
+
+    Returns a list of (key_value, error_code) for keys that could not be updated.
+    """
+    key_values = [k for k in key_values if k]
+    requests = [dict(update_kwargs, Key={key_name: k}) for k in key_values]
+    return [(key[key_name], code) for key, code in run_updates(table, requests, max_workers)]
+
+
+def update_status_many(table, key_name, key_values, status, max_workers=None):
+    """SET status = `status` on every key."""
+    return update_many(table, key_name, key_values, {
+        'UpdateExpression': "SET #s=:s",
+        'ExpressionAttributeNames': {'#s': 'status'},
+        'ExpressionAttributeValues': {':s': status}
+    }, max_workers=max_workers)
+
+
+def put_many(table, items):
+    """
+    Full-item rewrite through BatchWriteItem, 25 items per call.
+
+    Unprocessed items are retried with backoff; returns the items that were
+    still unprocessed after MAX_ATTEMPTS.
+    """
+    client = table.meta.client
+    leftover = []
+    for i in range(0, len(items), BATCH_WRITE_SIZE):
+        pending = {table.name: [{'PutRequest': {'Item': item}} for item in items[i:i + BATCH_WRITE_SIZE]]}
+        for attempt in range(MAX_ATTEMPTS):
+            response = client.batch_write_item(RequestItems=pending)
+            pending = response.get('UnprocessedItems') or {}
+            if not pending:
+                break
+            _backoff(attempt)
+        leftover.extend(r['PutRequest']['Item'] for r in pending.get(table.name, []))
+    if leftover:
+        print(f"Batch write left {len(leftover)} unprocessed items in {table.name}")
+    return leftover
@@ -0,0 +1,75 @@
+import os
+import threading
+
+# Process-wide registry of AWS handles. Nothing here touches boto3 until a
+# handle is first requested, so handlers that only need `respond` (or OPTIONS
+# replies) never pay for importing boto3 or building a session. Every handle
+# is created once per container and reused across invocations.
+_lock = threading.RLock()
+_session = None
+_resources = {}
+_clients = {}
+_tables = {}
+
+
+def _config():
+    from botocore.config import Config
+    return Config(
+        connect_timeout=float(os.environ.get('AWS_CONNECT_TIMEOUT', '2')),
+        read_timeout=float(os.environ.get('AWS_READ_TIMEOUT', '10')),
+        max_pool_connections=int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '25')),
+        tcp_keepalive=True,
+        retries={'max_attempts': 4, 'mode': 'standard'}
+    )
+
+
+def session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                import boto3
+                _session = boto3.session.Session()
+    return _session
+
+
+def resource(service):
+    if service not in _resources:
+        with _lock:
+            if service not in _resources:
+                _resources[service] = session().resource(service, config=_config())
+    return _resources[service]
+
+
+def client(service):
+    """
+    Low-level client. For dynamodb this is the resource's own client, so it
+    shares the connection pool and still accepts plain Python values.
+    """
+    if service == 'dynamodb':
+        return resource('dynamodb').meta.client
+    if service not in _clients:
+        with _lock:
+            if service not in _clients:
+                _clients[service] = session().client(service, config=_config())
+    return _clients[service]
+
+
+def table(env_name):
+    """DynamoDB Table named by the environment variable `env_name`."""
+    if env_name not in _tables:
+        _tables[env_name] = resource('dynamodb').Table(os.environ[env_name])
+    return _tables[env_name]
+
+
+class LazyTable:
+    """Stands in for a Table until the first attribute access."""
+
+    def __init__(self, env_name):
+        self._env_name = env_name
+
+    def __getattr__(self, name):
+        return getattr(table(self._env_name), name)
+
+    def __repr__(self):
+        return f"LazyTable({self._env_name})"
@@ -0,0 +1,67 @@
+import os
+import gzip
+import uuid
+import datetime
+from common import clients
+from common.serialize import dumps
+
+# Exports go to S3 when EXPORT_BUCKET is set, otherwise to a local directory
+# (handy with sam local / tests). Items are written one line at a time, so
+# memory stays at one scan page no matter how large the table is.
+EXPORT_BUCKET = os.environ.get('EXPORT_BUCKET')
+EXPORT_DIR = os.environ.get('EXPORT_DIR', '/tmp/exports')
+EXPORT_PREFIX = 'exports/'
+URL_EXPIRES_IN = int(os.environ.get('EXPORT_URL_EXPIRES_IN', '3600'))
+
+
+def iter_scan(table, **scan_kwargs):
+    while True:
+        response = table.scan(**scan_kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def write_ndjson_gz(items, path):
+    count = 0
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for item in items:
+            f.write(dumps(item))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def export_table(table, name, items=None):
+    """
+    Stream `items` (default: a full paginated scan of `table`) into a
+    gzip-compressed NDJSON object and return a handle describing it.
+    """
+    if items is None:
+        items = iter_scan(table)
+    stamp = datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+    key = f"{EXPORT_PREFIX}{name}/{stamp}-{uuid.uuid4().hex[:8]}.ndjson.gz"
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    local_path = os.path.join(EXPORT_DIR, key.replace('/', '_'))
+    count = write_ndjson_gz(items, local_path)
+    handle = {'export_key': key, 'count': count, 'format': 'ndjson+gzip'}
+
+    if not EXPORT_BUCKET:
+        handle['path'] = local_path
+        return handle
+    s3 = clients.client('s3')
+    try:
+        # Stored as a .gz file, not Content-Encoding: clients would decompress it
+        # on download and save plain NDJSON under the .gz name
+        s3.upload_file(local_path, EXPORT_BUCKET, key, ExtraArgs={'ContentType': 'application/gzip'})
+    finally:
+        os.remove(local_path)
+    handle['url'] = s3.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': EXPORT_BUCKET, 'Key': key},
+        ExpiresIn=URL_EXPIRES_IN
+    )
+    handle['expires_in'] = URL_EXPIRES_IN
+    return handle
@@ -0,0 +1,96 @@
+import os
+import re
+import json
+import base64
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+
+# Paging contract shared by the list endpoints:
+#   ?limit=N        page size (default DEFAULT_LIMIT, capped at MAX_LIMIT)
+#   ?cursor=...     opaque token returned as `next_cursor` by the previous page
+#   ?fields=a,b,c   attributes to return (ProjectionExpression)
+# Responses are {'data': [...], 'next_cursor': token-or-null}.
+DEFAULT_LIMIT = int(os.environ.get('PAGE_DEFAULT_LIMIT', '100'))
+MAX_LIMIT = int(os.environ.get('PAGE_MAX_LIMIT', '1000'))
+FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+class PageParamError(ValueError):
+    pass
+
+
+def serialize_key(key):
+    return {k: _serializer.serialize(v) for k, v in key.items()}
+
+
+def deserialize_key(data):
+    return {k: _deserializer.deserialize(v) for k, v in data.items()}
+
+
+def encode_token(obj):
+    raw = json.dumps(obj, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    try:
+        return json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except Exception:
+        raise PageParamError('Invalid cursor.')
+
+
+def encode_cursor(last_evaluated_key):
+    if not last_evaluated_key:
+        return None
+    return encode_token(serialize_key(last_evaluated_key))
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        return deserialize_key(decode_token(cursor))
+    except PageParamError:
+        raise
+    except Exception:
+        raise PageParamError('Invalid cursor.')
+
+
+def page_kwargs(params):
+    """Translate limit/cursor/fields query parameters into query()/scan() kwargs."""
+    kwargs = {}
+    try:
+        limit = int(params.get('limit') or DEFAULT_LIMIT)
+    except ValueError:
+        raise PageParamError('limit must be an integer.')
+    if limit <= 0:
+        raise PageParamError('limit must be positive.')
+    kwargs['Limit'] = min(limit, MAX_LIMIT)
+
+    start_key = decode_cursor(params.get('cursor'))
+    if start_key:
+        kwargs['ExclusiveStartKey'] = start_key
+
+    fields = [f.strip() for f in (params.get('fields') or '').split(',') if f.strip()]
+    if fields:
+        if not all(FIELD_NAME.match(f) for f in fields):
+            raise PageParamError('Invalid fields.')
+        names = {f'#f{i}': f for i, f in enumerate(fields)}
+        kwargs['ProjectionExpression'] = ', '.join(names)
+        kwargs['ExpressionAttributeNames'] = names
+    return kwargs
+
+
+def read_page(operation, params, **kwargs):
+    """
+    Run one page of table.query / table.scan with the request's paging params.
+
+    Returns (items, next_cursor). Raises PageParamError on bad parameters.
+    """
+    page = page_kwargs(params)
+    if 'ExpressionAttributeNames' in kwargs and 'ExpressionAttributeNames' in page:
+        page['ExpressionAttributeNames'] = {**kwargs.pop('ExpressionAttributeNames'), **page['ExpressionAttributeNames']}
+    response = operation(**kwargs, **page)
+    return response.get('Items', []), encode_cursor(response.get('LastEvaluatedKey'))
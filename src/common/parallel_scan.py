@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from common.paging import page_kwargs, encode_token, decode_token, serialize_key, deserialize_key, PageParamError
+
+# Segment workers call the table's low-level client, which is thread-safe.
+TOTAL_SEGMENTS = int(os.environ.get('SCAN_TOTAL_SEGMENTS', '8'))
+
+
+def scan_segment(table, segment, total_segments, **scan_kwargs):
+    """Every item of one segment, following LastEvaluatedKey."""
+    client = table.meta.client
+    request = dict(scan_kwargs, TableName=table.name, Segment=segment, TotalSegments=total_segments)
+    items = []
+    while True:
+        response = client.scan(**request)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        request['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def parallel_scan(table, total_segments=None, ordered=True, **scan_kwargs):
+    """
+    Full-table scan split into Segment/TotalSegments, one thread per segment.
+
+    ordered=True concatenates segments in segment order so repeated calls
+    return items in the same order; ordered=False appends each segment as soon
+    as it finishes.
+    """
+    total_segments = total_segments or TOTAL_SEGMENTS
+    with ThreadPoolExecutor(max_workers=total_segments) as pool:
+        futures = [
+            pool.submit(scan_segment, table, segment, total_segments, **scan_kwargs)
+            for segment in range(total_segments)
+        ]
+        if ordered:
+            return [item for f in futures for item in f.result()]
+        items = []
+        for f in as_completed(futures):
+            items.extend(f.result())
+        return items
+
+
+def read_page_parallel(table, params, total_segments=None, key_names=None, **scan_kwargs):
+    """
+    One page of a segmented scan under the common paging contract.
+
+    The cursor remembers where every segment stopped, so each page fans out
+    over the segments that still have data and splits `limit` between them.
+    The merged page is capped at `limit`; a segment cut short resumes after
+    its last returned item, so key_names (default: the table's key schema)
+    must name the key the scan pages on. Returns (items, next_cursor).
+    """
+    # The cursor here is per-segment state, not a single ExclusiveStartKey
+    page = page_kwargs({k: v for k, v in params.items() if k != 'cursor'})
+    limit = page.pop('Limit')
+    state = decode_token(params.get('cursor')) if params.get('cursor') else None
+    if state is None:
+        total_segments = total_segments or TOTAL_SEGMENTS
+        positions = {str(s): {} for s in range(total_segments)}
+    else:
+        try:
+            total_segments = int(state['total'])
+            positions = state['segments']
+        except (KeyError, TypeError, ValueError):
+            raise PageParamError('Invalid cursor.')
+    active = sorted(positions, key=int)
+    if not active:
+        return [], None
+    per_segment = max(1, -(-limit // len(active)))
+
+    # The cursor needs the key of every returned item, even under ?fields=
+    key_names = key_names or [k['AttributeName'] for k in table.key_schema]
+    added = []
+    if 'ProjectionExpression' in page:
+        added = [k for k in key_names if k not in page['ExpressionAttributeNames'].values()]
+        for i, name in enumerate(added):
+            page['ExpressionAttributeNames'][f'#k{i}'] = name
+            page['ProjectionExpression'] += f', #k{i}'
+
+    client = table.meta.client
+    request = dict(scan_kwargs, TableName=table.name, TotalSegments=total_segments, Limit=per_segment, **page)
+
+    def read(segment):
+        kwargs = dict(request, Segment=int(segment))
+        if positions[segment]:
+            kwargs['ExclusiveStartKey'] = deserialize_key(positions[segment])
+        return client.scan(**kwargs)
+
+    with ThreadPoolExecutor(max_workers=len(active)) as pool:
+        responses = list(pool.map(read, active))
+
+    items = []
+    remaining = {}
+    for segment, response in zip(active, responses):
+        segment_items = response.get('Items', [])
+        taken = segment_items[:limit - len(items)]
+        items.extend(taken)
+        if len(taken) < len(segment_items):
+            # Cut short: resume right after the last item this page returned
+            remaining[segment] = serialize_key({k: taken[-1][k] for k in key_names}) if taken else positions[segment]
+        elif 'LastEvaluatedKey' in response:
+            remaining[segment] = serialize_key(response['LastEvaluatedKey'])
+    for item in items:
+        for name in added:
+            item.pop(name, None)
+    next_cursor = encode_token({'total': total_segments, 'segments': remaining}) if remaining else None
+    return items, next_cursor
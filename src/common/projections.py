@@ -0,0 +1,180 @@
+import time
+from boto3.dynamodb.conditions import Key
+from common import clients
+from common.clients import LazyTable
+
+# Pre-aggregated dashboard numbers, kept up to date from DynamoDB Streams by
+# projection_consumer. Every projection item lives in the Projections table
+# under (projection, key):
+#   status#<Table> / <status>  -> count         (Packages, StoringOrders, PickOrders, PickSlips)
+#   on-hand        / <product> -> quantity      (sum of Inventory.quantity)
+#   bin-fill       / <bin_id>  -> quantity      (units in the bin, from Inventory)
+#                                 volume, availability_vol (copied from Bins)
+#   event          / <eventID> -> expires_at    (applied stream records, for dedup)
+projections_table = LazyTable('PROJECTIONS_TABLE')
+
+STATUS_FIELDS = {
+    'Packages': 'status',
+    'StoringOrders': 'status',
+    'PickOrders': 'pick_order_status',
+    'PickSlips': 'pick_slip_status',
+}
+ON_HAND = 'on-hand'
+BIN_FILL = 'bin-fill'
+EVENT = 'event'
+# Stream records are kept for 24h, so markers only need to outlive retries
+EVENT_TTL_SECONDS = 2 * 24 * 3600
+# Each record adds a marker plus at most 3 distinct projection keys; 25
+# records stay under the 100-item transaction limit.
+CHUNK_RECORDS = 25
+
+
+def status_projection(table_name):
+    return f"status#{table_name}"
+
+
+def source_table(record):
+    # arn:aws:dynamodb:<region>:<account>:table/<TableName>/stream/<label>
+    return record['eventSourceARN'].split(':table/', 1)[1].split('/', 1)[0]
+
+
+def _deserialize(image):
+    if not image:
+        return None
+    from boto3.dynamodb.types import TypeDeserializer
+    deserializer = TypeDeserializer()
+    return {k: deserializer.deserialize(v) for k, v in image.items()}
+
+
+def record_changes(record):
+    """
+    Projection changes caused by one stream record, as a dict of
+    (projection, key) -> {'add': {field: n}, 'set': {field: value}}.
+    """
+    table_name = source_table(record)
+    old = _deserialize(record['dynamodb'].get('OldImage')) or {}
+    new = _deserialize(record['dynamodb'].get('NewImage')) or {}
+    changes = {}
+
+    def add(projection, key, field, amount):
+        change = changes.setdefault((projection, key), {'add': {}, 'set': {}})
+        change['add'][field] = change['add'].get(field, 0) + amount
+
+    if table_name in STATUS_FIELDS:
+        field = STATUS_FIELDS[table_name]
+        before, after = old.get(field), new.get(field)
+        if before != after:
+            if before:
+                add(status_projection(table_name), before, 'count', -1)
+            if after:
+                add(status_projection(table_name), after, 'count', 1)
+    elif table_name == 'Inventory':
+        item = new or old
+        delta = int(new.get('quantity') or 0) - int(old.get('quantity') or 0)
+        if delta:
+            add(ON_HAND, item['product_id'], 'quantity', delta)
+            add(BIN_FILL, item['bin_id'], 'quantity', delta)
+    elif table_name == 'Bins' and new:
+        values = {f: new[f] for f in ('volume', 'availability_vol') if f in new}
+        if values and any(old.get(f) != v for f, v in values.items()):
+            changes[(BIN_FILL, new['bin_id'])] = {'add': {}, 'set': values}
+    return changes
+
+
+def merge_changes(changes_list):
+    merged = {}
+    for changes in changes_list:
+        for target, change in changes.items():
+            current = merged.setdefault(target, {'add': {}, 'set': {}})
+            for field, amount in change['add'].items():
+                current['add'][field] = current['add'].get(field, 0) + amount
+            # Later records win for absolute values
+            current['set'].update(change['set'])
+    return merged
+
+
+def _update(projection, key, change, now):
+    names, values, adds, sets = {}, {':now': now}, [], ['updated_at = :now']
+    for i, (field, amount) in enumerate(change['add'].items()):
+        names[f'#a{i}'] = field
+        values[f':a{i}'] = amount
+        adds.append(f"#a{i} :a{i}")
+    for i, (field, value) in enumerate(change['set'].items()):
+        names[f'#s{i}'] = field
+        values[f':s{i}'] = value
+        sets.append(f"#s{i} = :s{i}")
+    expression = f"SET {', '.join(sets)}"
+    if adds:
+        expression += f" ADD {', '.join(adds)}"
+    return {'Update': {
+        'TableName': projections_table.name,
+        'Key': {'projection': projection, 'key': key},
+        'UpdateExpression': expression,
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values
+    }}
+
+
+def apply_records(records):
+    """
+    Apply up to CHUNK_RECORDS stream records in one transaction together with
+    an event marker per record. A record whose marker already exists was
+    applied by an earlier (retried) invocation and is dropped, so redelivery
+    never double-counts. Returns the number of records applied.
+    """
+    pending = [(record, record_changes(record)) for record in records]
+    pending = [(record, changes) for record, changes in pending if changes]
+    while pending:
+        now = int(time.time())
+        transact_items = [{'Put': {
+            'TableName': projections_table.name,
+            'Item': {'projection': EVENT, 'key': record['eventID'], 'expires_at': now + EVENT_TTL_SECONDS},
+            'ConditionExpression': 'attribute_not_exists(#k)',
+            'ExpressionAttributeNames': {'#k': 'key'}
+        }} for record, _ in pending]
+        merged = merge_changes(changes for _, changes in pending)
+        transact_items.extend(_update(projection, key, change, now) for (projection, key), change in merged.items())
+        try:
+            clients.client('dynamodb').transact_write_items(TransactItems=transact_items)
+            return len(pending)
+        except clients.client('dynamodb').exceptions.TransactionCanceledException as e:
+            reasons = e.response.get('CancellationReasons', [])
+            seen = {i for i, reason in enumerate(reasons[:len(pending)]) if reason.get('Code') == 'ConditionalCheckFailed'}
+            if not seen:
+                raise
+            print(f"Skipping {len(seen)} already applied stream records")
+            pending = [p for i, p in enumerate(pending) if i not in seen]
+    return 0
+
+
+def query_projection(projection, **kwargs):
+    items = []
+    kwargs['KeyConditionExpression'] = Key('projection').eq(projection)
+    while True:
+        response = projections_table.query(**kwargs)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def status_counts(table_name):
+    """{status: count} for one source table; statuses that dropped to zero are omitted."""
+    return {item['key']: item['count'] for item in query_projection(status_projection(table_name))
+            if item.get('count')}
+
+
+def get_projection_items(projection, keys, batch_size=100):
+    """Projection items for specific keys via BatchGetItem, in request order."""
+    found = {}
+    keys = list(dict.fromkeys(keys))
+    for i in range(0, len(keys), batch_size):
+        request = {projections_table.name: {
+            'Keys': [{'projection': projection, 'key': key} for key in keys[i:i + batch_size]]
+        }}
+        while request:
+            response = clients.resource('dynamodb').batch_get_item(RequestItems=request)
+            for item in response.get('Responses', {}).get(projections_table.name, []):
+                found[item['key']] = item
+            request = response.get('UnprocessedKeys') or None
+    return [found[key] for key in keys if key in found]
@@ -0,0 +1,165 @@
+import os
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+from common import clients
+from common.bulk import _backoff, MAX_ATTEMPTS
+from common.utils import storing_table
+from common.transitions import transact, TransitionConflict
+
+# Document inspection for storing orders, shared by POST /storing-orders/receive
+# (one order) and POST /storing-orders/receive-bulk (a truckload). An order and
+# all of its packages always move in the same transaction; the bulk path packs
+# several orders into each transaction and runs the transactions in parallel.
+MAX_TRANSACTION_ITEMS = 100
+MAX_WORKERS = int(os.environ.get('RECEIVE_MAX_WORKERS', '4'))
+BATCH_GET_SIZE = 100
+# Whole-transaction failures worth another attempt (concurrent writers, throttling)
+RETRYABLE_REASONS = {'TransactionConflict', 'ThrottlingError', 'ProvisionedThroughputExceeded'}
+RETRYABLE_ERRORS = {'ThrottlingException', 'ProvisionedThroughputExceededException',
+                    'RequestLimitExceeded', 'InternalServerError', 'TransactionInProgressException'}
+# request field -> StoringOrders attribute it must match
+CHECKED_FIELDS = (
+    ('invoice_number', 'invoice_number'),
+    ('bill_of_entry_id', 'bill_of_entry_id'),
+    ('airway_bill_number', 'airway_bill_number'),
+    ('quantity', 'package_quantity'),
+)
+
+
+def parse_request(body):
+    """(storing_order_id, {field: value}); KeyError/TypeError on missing fields."""
+    return body['storing_order_id'], {field: body[field] for field, _ in CHECKED_FIELDS}
+
+
+def package_ids_of(order):
+    return list(dict.fromkeys(p for p in order.get('package_ids', '[]').strip('[]').split(';') if p))
+
+
+def mismatches(order, fields):
+    return [attr for field, attr in CHECKED_FIELDS if order.get(attr) != fields[field]]
+
+
+def inspect(sid, order, fields, employee_id, now=None):
+    """
+    The transition plan for one fetched order: (steps, discrepancy_detail).
+    Steps are common.transitions.transact steps for the order and its
+    packages; discrepancy_detail is None when the documents match.
+    """
+    package_ids = package_ids_of(order)
+    wrong = mismatches(order, fields)
+    if wrong:
+        detail = f"Mismatches: {','.join(wrong)}"
+        action, sets = 'reject', {
+            'discrepancy_detail': detail, 'doc_inspection_result': 'Failure', 'receiver_id': employee_id
+        }
+    else:
+        detail = None
+        action, sets = 'receive', {
+            'received_date': now or datetime.datetime.utcnow().isoformat(), 'doc_inspection_result': 'Success',
+            'discrepancy_detail': '', 'receiver_id': employee_id
+        }
+    steps = [('storing_order', action, sid, {'sets': sets})]
+    steps += [('package', action, pid, {}) for pid in package_ids]
+    return steps, detail
+
+
+def get_orders(sids):
+    """{storing_order_id: order} via consistent BatchGetItem; missing orders are absent."""
+    found = {}
+    sids = list(dict.fromkeys(sids))
+    for i in range(0, len(sids), BATCH_GET_SIZE):
+        request = {storing_table.name: {
+            'Keys': [{'storing_order_id': sid} for sid in sids[i:i + BATCH_GET_SIZE]],
+            'ConsistentRead': True
+        }}
+        attempt = 0
+        while request:
+            response = clients.resource('dynamodb').batch_get_item(RequestItems=request)
+            for item in response.get('Responses', {}).get(storing_table.name, []):
+                found[item['storing_order_id']] = item
+            request = response.get('UnprocessedKeys') or None
+            if request:
+                # Unprocessed keys mean throttling; back off before asking again
+                _backoff(attempt)
+                attempt += 1
+    return found
+
+
+def _chunks(plans):
+    """
+    Group (sid, steps) into transactions of at most MAX_TRANSACTION_ITEMS
+    items. An order is never split, and a package listed on two orders goes
+    into different transactions (one transaction may not touch an item twice).
+    """
+    chunks, current, size, keys = [], [], 0, set()
+    for sid, steps in plans:
+        step_keys = {(entity, key) for entity, _, key, _ in steps}
+        if current and (size + len(steps) > MAX_TRANSACTION_ITEMS or keys & step_keys):
+            chunks.append(current)
+            current, size, keys = [], 0, set()
+        current.append((sid, steps))
+        size += len(steps)
+        keys |= step_keys
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _retryable(error):
+    if error.response['Error']['Code'] in RETRYABLE_ERRORS:
+        return True
+    reasons = {r.get('Code') for r in error.response.get('CancellationReasons', [])}
+    return bool(reasons & RETRYABLE_REASONS)
+
+
+def _commit_chunk(chunk):
+    """
+    Commit one chunk. A transaction is all-or-nothing, so orders named in a
+    TransitionConflict are dropped with their error and the rest retried;
+    conflicts with concurrent writers and throttling are retried with
+    backoff. Returns {sid: None (committed) | (status code, message)}.
+    """
+    results = {}
+    attempt = 0
+    while chunk:
+        try:
+            transact([step for _, steps in chunk for step in steps])
+        except TransitionConflict as e:
+            owner = {(entity, key): sid for sid, steps in chunk for entity, _, key, _ in steps}
+            by_order = {}
+            for conflict in e.conflicts:
+                by_order.setdefault(owner[(conflict[0], conflict[1])], []).append(conflict)
+            for sid, conflicts in by_order.items():
+                error = TransitionConflict(conflicts)
+                print(f"Receive {sid} rejected: {error}")
+                results[sid] = (404 if error.not_found else 409, str(error))
+            chunk = [(sid, steps) for sid, steps in chunk if sid not in by_order]
+            continue
+        except ClientError as e:
+            code = e.response['Error']['Code']
+            if _retryable(e) and attempt < MAX_ATTEMPTS - 1:
+                print(f"Receive transaction for {[sid for sid, _ in chunk]} cancelled ({code}), retrying")
+                _backoff(attempt)
+                attempt += 1
+                continue
+            print(f"Receive transaction for {[sid for sid, _ in chunk]} failed: {code}")
+            status = 503 if _retryable(e) else 500
+            results.update({sid: (status, f"Transaction failed ({code}), retry this order.") for sid, _ in chunk})
+            return results
+        results.update({sid: None for sid, _ in chunk})
+        return results
+    return results
+
+
+def commit_many(plans, max_workers=None):
+    """Commit [(sid, steps)] in chunked transactions; {sid: None | (status code, message)}."""
+    chunks = _chunks(plans)
+    if not chunks:
+        return {}
+    results = {}
+    workers = min(max_workers or MAX_WORKERS, len(chunks))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk_results in pool.map(_commit_chunk, chunks):
+            results.update(chunk_results)
+    return results
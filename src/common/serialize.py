@@ -0,0 +1,82 @@
+import os
+import json
+import datetime
+from decimal import Decimal
+
+# One JSON encoder for every handler. DynamoDB numbers come back as Decimal;
+# they are written as JSON numbers (int when integral, float otherwise) by
+# both backends, so output is identical whether or not orjson is installed.
+# JSON_BACKEND=json forces the standard library.
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+
+CORS_ALLOW_HEADERS = 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token'
+
+# Largest magnitude a float holds exactly; beyond it integers go through int(Decimal)
+_EXACT_FLOAT = 2 ** 53
+
+try:
+    if JSON_BACKEND == 'json':
+        raise ImportError
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def number(o):
+    """Decimal -> int/float without Decimal arithmetic."""
+    f = float(o)
+    if f.is_integer():
+        return int(f) if -_EXACT_FLOAT < f < _EXACT_FLOAT else int(o)
+    return f
+
+
+def default(o):
+    if isinstance(o, Decimal):
+        return number(o)
+    if isinstance(o, (set, frozenset)):
+        # DynamoDB string/number sets
+        return sorted(o, key=str)
+    if isinstance(o, (datetime.datetime, datetime.date)):
+        return o.isoformat()
+    if isinstance(o, (bytes, bytearray)):
+        return o.decode('utf-8', 'replace')
+    return str(o)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS).decode()
+else:
+    _encoder = json.JSONEncoder(default=default, separators=(',', ':'), ensure_ascii=False)
+
+    def dumps(obj):
+        return _encoder.encode(obj)
+
+
+_header_cache = {}
+
+
+def cors_headers(methods='GET, POST, PUT, DELETE, OPTIONS'):
+    """
+    Shared response headers for `methods`. The same dict is returned on every
+    call, so callers must not modify it.
+    """
+    headers = _header_cache.get(methods)
+    if headers is None:
+        headers = _header_cache[methods] = {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Methods': methods,
+            'Access-Control-Allow-Headers': CORS_ALLOW_HEADERS
+        }
+    return headers
+
+
+def json_response(status_code, body, methods='GET, POST, PUT, DELETE, OPTIONS'):
+    return {
+        'statusCode': status_code,
+        'headers': cors_headers(methods),
+        'body': dumps(body)
+    }
@@ -0,0 +1,137 @@
+import os
+import heapq
+import zlib
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key
+from common.paging import encode_token, decode_token, serialize_key, deserialize_key, PageParamError
+
+# Write-sharded status index (StatusDateIndex on Packages, StoringOrders,
+# PickOrders and PickSlips). A GSI keyed on the raw status puts every item in a
+# busy status (READY-FOR-PICKING, READY-FOR-PACKING, READY-FOR-TQ) on one
+# partition, so each item carries
+#   status_shard = "<status>#<n>"   n = crc32(primary key) % STATUS_SHARDS
+#   status_date  = when the status was last written
+# and readers fan out over the STATUS_SHARDS partitions and merge by date.
+# n only depends on the key, so every writer agrees on it; changing
+# STATUS_SHARDS means re-running scripts/backfill_status_shard.py.
+# Writers always set the attributes; the index itself is staged behind the
+# stack's StatusDateIndexes parameter, and readers check status_index_enabled().
+STATUS_INDEX = 'StatusDateIndex'
+STATUS_SHARDS = 8
+SHARD_ATTR = 'status_shard'
+DATE_ATTR = 'status_date'
+
+
+def status_index_enabled():
+    return os.environ.get('STATUS_DATE_INDEXES', 'enabled') == 'enabled'
+
+
+def shard_of(key_value, shards=STATUS_SHARDS):
+    return zlib.crc32(str(key_value).encode()) % shards
+
+
+def status_shard(status, key_value, shards=STATUS_SHARDS):
+    return f"{status}#{shard_of(key_value, shards)}"
+
+
+def status_keys(status, key_value, now=None, shards=STATUS_SHARDS):
+    """The two index attributes to SET alongside a status write."""
+    return {SHARD_ATTR: status_shard(status, key_value, shards), DATE_ATTR: now or datetime.now().isoformat()}
+
+
+def shard_set(status, key_value, now=None):
+    """
+    (SET clause, ExpressionAttributeValues) for handlers that write their own
+    update expressions, e.g. "SET pick_slip_status = :status, " + clause.
+    """
+    keys = status_keys(status, key_value, now)
+    return (f"{SHARD_ATTR} = :{SHARD_ATTR}, {DATE_ATTR} = :{DATE_ATTR}",
+            {f':{attr}': value for attr, value in keys.items()})
+
+
+def date_condition(since=None, until=None):
+    if since and until:
+        return Key(DATE_ATTR).between(since, until)
+    if since:
+        return Key(DATE_ATTR).gte(since)
+    if until:
+        return Key(DATE_ATTR).lte(until)
+    return None
+
+
+def _encode_state(state):
+    # shard -> ExclusiveStartKey, None (not started) or False (exhausted)
+    return encode_token({str(s): serialize_key(k) if k else k for s, k in state.items()})
+
+
+def _decode_state(cursor, shards):
+    try:
+        raw = decode_token(cursor)
+        state = {int(s): deserialize_key(k) if k else k for s, k in raw.items()}
+    except PageParamError:
+        raise
+    except Exception:
+        raise PageParamError('Invalid cursor.')
+    if set(state) != set(range(shards)):
+        raise PageParamError('Invalid cursor.')
+    return state
+
+
+def query_status(table, key_names, status, since=None, until=None, limit=100, cursor=None,
+                 descending=False, shards=STATUS_SHARDS, **kwargs):
+    """
+    One page of items in `status`, ordered by status_date across all shards.
+
+    Every unfinished shard is queried in parallel for up to `limit` items, the
+    results are merged and the first `limit` kept. The cursor remembers, per
+    shard, the last item actually returned, so nothing is skipped or repeated.
+    `key_names` are the table's primary key attributes (needed to rebuild the
+    index position of a returned item). Returns (items, next_cursor).
+    """
+    state = _decode_state(cursor, shards) if cursor else {s: None for s in range(shards)}
+    condition = date_condition(since, until)
+    if 'ProjectionExpression' in kwargs:
+        # The cursor needs the index key of every returned item
+        names = dict(kwargs.get('ExpressionAttributeNames') or {})
+        for i, attr in enumerate([*key_names, SHARD_ATTR, DATE_ATTR]):
+            names[f'#k{i}'] = attr
+        kwargs['ProjectionExpression'] += ', ' + ', '.join(f'#k{i}' for i in range(len(key_names) + 2))
+        kwargs['ExpressionAttributeNames'] = names
+
+    def query_shard(shard):
+        key_condition = Key(SHARD_ATTR).eq(f"{status}#{shard}")
+        if condition is not None:
+            key_condition = key_condition & condition
+        request = dict(kwargs, IndexName=STATUS_INDEX, KeyConditionExpression=key_condition,
+                       Limit=limit, ScanIndexForward=not descending)
+        if state[shard]:
+            request['ExclusiveStartKey'] = state[shard]
+        response = table.query(**request)
+        return response.get('Items', []), response.get('LastEvaluatedKey')
+
+    active = [s for s in range(shards) if state[s] is not False]
+    if not active:
+        return [], None
+    with ThreadPoolExecutor(max_workers=len(active)) as pool:
+        results = dict(zip(active, pool.map(query_shard, active)))
+
+    # Each shard's items are already in date order; merge keeps that order, so
+    # what a page takes from a shard is always a prefix of its results.
+    streams = [[(item.get(DATE_ATTR, ''), shard, item) for item in items] for shard, (items, _) in results.items()]
+    page = []
+    taken = {shard: 0 for shard in results}
+    for _, shard, item in heapq.merge(*streams, key=lambda entry: entry[0], reverse=descending):
+        if len(page) >= limit:
+            break
+        page.append(item)
+        taken[shard] += 1
+
+    for shard, (items, last_key) in results.items():
+        if taken[shard] == len(items):
+            state[shard] = last_key or False
+        elif taken[shard]:
+            last = items[taken[shard] - 1]
+            state[shard] = {k: last[k] for k in (*key_names, SHARD_ATTR, DATE_ATTR)}
+    next_cursor = _encode_state(state) if any(v is not False for v in state.values()) else None
+    return page, next_cursor
@@ -0,0 +1,59 @@
+import json
+import hashlib
+
+SEND_BATCH_SIZE = 10
+
+
+def event_reads(event, fields):
+    """
+    Tag reads carried by an IoT event: either a single read (legacy payload)
+    or {"reads": [...]} when the reader publishes in batched mode. Malformed
+    entries are logged and skipped so one bad read does not drop the batch.
+    """
+    reads = event.get('reads') if isinstance(event, dict) else None
+    if reads is None:
+        reads = [event]
+    if not isinstance(reads, list):
+        print(f"Ignoring malformed reads payload: {reads!r}")
+        return []
+    valid = []
+    for read in reads:
+        if not isinstance(read, dict) or not read.get('rfid_id'):
+            print(f"Skipping malformed read: {read!r}")
+            continue
+        valid.append({f: read.get(f) for f in fields})
+    return valid
+
+
+def dedupe_id(read):
+    """
+    FIFO deduplication id for one read: its tag plus package and timestamp,
+    so a later real read of the same tag (TQ restart, bin scan after TQ) is
+    not swallowed by the 5-minute dedupe window. Consumers drop true repeats.
+    """
+    return hashlib.sha256(json.dumps(read, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def send_reads(sqs, queue_url, reads):
+    """
+    Send one SQS message per read using send_message_batch (10 per call).
+
+    FIFO queues get MessageGroupId=package_id so per-package ordering holds,
+    and dedupe_id(read) as deduplication id. Returns the reads SQS rejected.
+    """
+    fifo = queue_url.endswith('.fifo')
+    failed = []
+    for i in range(0, len(reads), SEND_BATCH_SIZE):
+        chunk = reads[i:i + SEND_BATCH_SIZE]
+        entries = []
+        for n, read in enumerate(chunk):
+            entry = {'Id': str(n), 'MessageBody': json.dumps(read)}
+            if fifo:
+                entry['MessageGroupId'] = str(read.get('package_id') or 'unknown')
+                entry['MessageDeduplicationId'] = dedupe_id(read)
+            entries.append(entry)
+        response = sqs.send_message_batch(QueueUrl=queue_url, Entries=entries)
+        for f in response.get('Failed', []):
+            print(f"SQS rejected read {chunk[int(f['Id'])]}: {f.get('Code')} {f.get('Message')}")
+            failed.append(chunk[int(f['Id'])])
+    return failed
@@ -0,0 +1,67 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key
+from common.cache import TTLCache
+from common.clients import LazyTable
+
+# "Which bins hold product X with at least N units", answered from
+# Inventory's ProductQuantityIndex (product_id, quantity) instead of a scan.
+# Results are cached per container for STOCK_CACHE_TTL seconds; the index is
+# eventually consistent anyway, so a few seconds of staleness costs nothing.
+PRODUCT_INDEX = 'ProductQuantityIndex'
+STOCK_CACHE_TTL = float(os.environ.get('STOCK_CACHE_TTL', '5'))
+STOCK_CACHE_SIZE = int(os.environ.get('STOCK_CACHE_SIZE', '2048'))
+MAX_WORKERS = int(os.environ.get('STOCK_MAX_WORKERS', '8'))
+
+inventory_table = LazyTable('INVENTORY_TABLE')
+_cache = TTLCache(STOCK_CACHE_SIZE)
+
+
+def _query_bins(product_id, min_quantity, limit):
+    kwargs = {
+        'TableName': inventory_table.name,
+        'IndexName': PRODUCT_INDEX,
+        'KeyConditionExpression': Key('product_id').eq(product_id) & Key('quantity').gte(min_quantity),
+        'ProjectionExpression': '#b, #q',
+        'ExpressionAttributeNames': {'#b': 'bin_id', '#q': 'quantity'},
+        # Largest stock first
+        'ScanIndexForward': False
+    }
+    if limit:
+        kwargs['Limit'] = limit
+    client = inventory_table.meta.client
+    bins = []
+    while True:
+        response = client.query(**kwargs)
+        bins.extend({'bin_id': item['bin_id'], 'quantity': item['quantity']} for item in response.get('Items', []))
+        if 'LastEvaluatedKey' not in response or (limit and len(bins) >= limit):
+            return bins[:limit] if limit else bins
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def bins_for_product(product_id, min_quantity=1, limit=None):
+    """Bins holding at least `min_quantity` units of `product_id`, highest quantity first."""
+    cache_key = (product_id, min_quantity, limit)
+    bins = _cache.get(cache_key)
+    if bins is None:
+        bins = _query_bins(product_id, min_quantity, limit)
+        _cache.put(cache_key, bins, STOCK_CACHE_TTL)
+    return bins
+
+
+def bins_for_products(min_quantities, limit=None, max_workers=None):
+    """
+    {product_id: min_quantity} -> {product_id: [bins]}. Uncached products
+    are queried in parallel, one index query each.
+    """
+    products = list(min_quantities.items())
+    if not products:
+        return {}
+    workers = min(max_workers or MAX_WORKERS, len(products))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda p: bins_for_product(p[0], p[1], limit), products)
+        return {product_id: bins for (product_id, _), bins in zip(products, results)}
+
+
+def clear_cache():
+    _cache.invalidate()
@@ -0,0 +1,180 @@
+from boto3.dynamodb.types import TypeDeserializer
+from common import clients
+from common.sharding import status_keys
+
+# Status state machine shared by every handler that moves a package, storing
+# order or pick slip. Each transition is one conditional write
+# (`#s IN (:from...)`) with ReturnValuesOnConditionCheckFailure=ALL_OLD, so a
+# handler never reads before it writes: the current item only comes back when
+# the condition fails, and tells a missing item (404) from a wrong status (409).
+ENTITIES = {
+    # entity -> (table env, key attribute, status attribute)
+    'package': ('PACKAGES_TABLE', 'package_id', 'status'),
+    'storing_order': ('STORING_ORDERS_TABLE', 'storing_order_id', 'status'),
+    'pick_slip': ('PICK_SLIPS_TABLE', 'pick_slip_id', 'pick_slip_status'),
+}
+
+TRANSITIONS = {
+    # (entity, action) -> (statuses it may start from, status it ends in)
+    ('storing_order', 'receive'): (('OPEN', 'INSPECTION-FAILED'), 'RECEIVED'),
+    ('storing_order', 'reject'): (('OPEN', 'INSPECTION-FAILED'), 'INSPECTION-FAILED'),
+    ('storing_order', 'record_discrepancy'): (('INSPECTION-FAILED',), 'INSPECTION-FAILED'),
+    ('package', 'receive'): (('OPEN', 'INSPECTION-FAILED', 'READY-FOR-TQ'), 'READY-FOR-TQ'),
+    ('package', 'reject'): (('OPEN', 'INSPECTION-FAILED', 'READY-FOR-TQ'), 'INSPECTION-FAILED'),
+    ('package', 'tq_pass'): (('READY-FOR-TQ',), 'READY-FOR-RFID-ATTACH'),
+    ('package', 'tq_fail'): (('READY-FOR-TQ',), 'TQ-QUALITY-CHECK-FAILED'),
+    ('package', 'start_tq'): (('READY-FOR-RFID-ATTACH', 'TQ-CHECKING', 'TQ-FAILED'), 'TQ-CHECKING'),
+    # First RFID read of a package nobody started explicitly (tq_rfid_consumer)
+    ('package', 'scan_start'): (('READY-FOR-RFID-ATTACH',), 'TQ-CHECKING'),
+    # tq_rfid_consumer completes a fully scanned package on its own, so
+    # close-tq may find it READY-FOR-BIN-ALLOCATION already
+    ('package', 'close_tq_pass'): (('TQ-CHECKING', 'READY-FOR-BIN-ALLOCATION'), 'READY-FOR-BIN-ALLOCATION'),
+    ('package', 'close_tq_fail'): (('TQ-CHECKING', 'READY-FOR-BIN-ALLOCATION'), 'TQ-QUALITY-CHECK-FAILED'),
+    # tq_rfid_consumer, once tq_scanned_quantity reaches quantity
+    ('package', 'tq_complete'): (('TQ-CHECKING',), 'READY-FOR-BIN-ALLOCATION'),
+    ('package', 'tq_timeout'): (('TQ-CHECKING',), 'TQ-FAILED'),
+    ('package', 'allocate_bins'): (('READY-FOR-BIN-ALLOCATION',), 'READY-FOR-BINNING'),
+    # bin_rfid_consumer: every counted batch of scans, then binned_count reaching quantity
+    ('package', 'bin_scan'): (('READY-FOR-BINNING', 'BINNING'), 'BINNING'),
+    ('package', 'bin_complete'): (('BINNING',), 'BINNED'),
+    ('package', 'close_binning'): (('READY-FOR-BINNING', 'BINNING', 'BINNED'), 'BINNED'),
+    ('pick_slip', 'close_packing'): (('PACKING-IN-PROGRESS',), 'READY-FOR-DISPATCH'),
+    ('pick_slip', 'dispatch'): (('READY-FOR-DISPATCH',), 'DISPATCHED'),
+}
+# Sparse index keys: the attribute holds the status while the item is in it
+# and is removed on the way out, so the index only lists those items.
+SPARSE_KEYS = {
+    ('package', 'TQ-CHECKING'): 'tq_checking',  # TqCheckingIndex (tq_reaper)
+}
+# Entities with a write-sharded StatusDateIndex (see common.sharding); every
+# transition also SETs their status_shard / status_date.
+SHARDED_ENTITIES = {'package', 'storing_order', 'pick_slip'}
+# The RFID stream consumers (tq_rfid_consumer, bin_rfid_consumer) build their
+# counting / completion writes from update_request as well, adding their
+# counter conditions and ADDs on top.
+
+_deserializer = TypeDeserializer()
+
+
+class TransitionConflict(Exception):
+    """
+    One or more items were missing or not in a status the action starts from.
+    `conflicts` is a list of (entity, key, action, current status); the
+    status is None when the item does not exist.
+    """
+
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        super().__init__('; '.join(_describe(*c) for c in conflicts))
+
+    @property
+    def not_found(self):
+        return all(status is None for _, _, _, status in self.conflicts)
+
+
+def _describe(entity, key, action, status):
+    label = entity.replace('_', ' ').capitalize()
+    if status is None:
+        return f"{label} {key} not found."
+    expected = ' or '.join(TRANSITIONS[(entity, action)][0])
+    current = f"is {status}" if status else "has no status"
+    return f"{label} {key} {current}, expected {expected}."
+
+
+def _current_status(entity, old_item):
+    """Status from a low-level ALL_OLD image; None if there was no item."""
+    if not old_item:
+        return None
+    status = old_item.get(ENTITIES[entity][2])
+    return _deserializer.deserialize(status) if status else ''
+
+
+def update_request(entity, action, key, sets=None, removes=(), condition=None, names=None, values=None,
+                   set_clauses=(), adds=None):
+    """
+    update_item arguments for one transition: SET the new status plus `sets`
+    ({attribute: value}) and raw `set_clauses`, ADD `adds` ({attribute:
+    number}), REMOVE `removes`, guarded by the allowed current statuses and
+    an optional extra `condition`. Clauses and condition use `names`/`values`.
+    """
+    env_name, key_name, status_name = ENTITIES[entity]
+    from_statuses, to_status = TRANSITIONS[(entity, action)]
+    expr_names = {'#s': status_name, **(names or {})}
+    expr_values = {':to': to_status, **(values or {})}
+    set_parts = ['#s = :to']
+    removes = list(removes)
+    if entity in SHARDED_ENTITIES:
+        sets = {**(sets or {}), **status_keys(to_status, key)}
+    for (sparse_entity, status), attr in SPARSE_KEYS.items():
+        if sparse_entity != entity:
+            continue
+        if status == to_status:
+            sets = {**(sets or {}), attr: status}
+        elif status in from_statuses:
+            removes.append(attr)
+    for i, (attr, value) in enumerate((sets or {}).items()):
+        expr_names[f'#f{i}'] = attr
+        expr_values[f':f{i}'] = value
+        set_parts.append(f'#f{i} = :f{i}')
+    set_parts.extend(set_clauses)
+    update = 'SET ' + ', '.join(set_parts)
+    if adds:
+        for i, (attr, value) in enumerate(adds.items()):
+            expr_names[f'#a{i}'] = attr
+            expr_values[f':a{i}'] = value
+        update += ' ADD ' + ', '.join(f'#a{i} :a{i}' for i in range(len(adds)))
+    if removes:
+        expr_names.update({f'#r{i}': attr for i, attr in enumerate(removes)})
+        update += ' REMOVE ' + ', '.join(f'#r{i}' for i in range(len(removes)))
+    expr_values.update({f':from{i}': status for i, status in enumerate(from_statuses)})
+    guard = '#s IN (' + ', '.join(f':from{i}' for i in range(len(from_statuses))) + ')'
+    if condition:
+        guard = f'{guard} AND ({condition})'
+    return {
+        'TableName': clients.table(env_name).name,
+        'Key': {key_name: key},
+        'UpdateExpression': update,
+        'ConditionExpression': guard,
+        'ExpressionAttributeNames': expr_names,
+        'ExpressionAttributeValues': expr_values,
+        'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+    }
+
+
+def transition(entity, action, key, **kwargs):
+    """
+    Apply one transition with a single conditional update_item and return the
+    updated item. Raises TransitionConflict instead of overwriting a status
+    that changed underneath the caller.
+    """
+    client = clients.client('dynamodb')
+    try:
+        response = client.update_item(ReturnValues='ALL_NEW', **update_request(entity, action, key, **kwargs))
+    except client.exceptions.ConditionalCheckFailedException as e:
+        raise TransitionConflict([(entity, key, action, _current_status(entity, e.response.get('Item')))])
+    return response['Attributes']
+
+
+def transact(steps, extra_items=()):
+    """
+    Apply several transitions atomically. `steps` is a list of
+    (entity, action, key, update_request kwargs); `extra_items` are further
+    TransactItems (e.g. Inventory ADDs) committed with them. On a failed
+    status condition raises TransitionConflict listing every offending item.
+    """
+    transact_items = list(extra_items) + [
+        {'Update': update_request(entity, action, key, **kwargs)} for entity, action, key, kwargs in steps
+    ]
+    client = clients.client('dynamodb')
+    try:
+        client.transact_write_items(TransactItems=transact_items)
+    except client.exceptions.TransactionCanceledException as e:
+        reasons = e.response.get('CancellationReasons', [])[len(extra_items):]
+        conflicts = [
+            (entity, key, action, _current_status(entity, reason.get('Item')))
+            for (entity, action, key, _), reason in zip(steps, reasons)
+            if reason.get('Code') == 'ConditionalCheckFailed'
+        ]
+        if conflicts:
+            raise TransitionConflict(conflicts) from e
+        raise
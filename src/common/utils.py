@@ -1,34 +1,17 @@
-import os, json
-import boto3
-from boto3.dynamodb.conditions import Key
+from common.clients import LazyTable
+from common.serialize import json_response
 
-print("Initializing DynamoDB resources...")
-dynamodb        = boto3.resource('dynamodb')
-storing_table   = dynamodb.Table(os.environ['STORING_ORDERS_TABLE'])
-packages_table  = dynamodb.Table(os.environ['PACKAGES_TABLE'])
-items_table     = dynamodb.Table(os.environ['ITEMS_TABLE'])
-api_keys_table  = dynamodb.Table(os.environ['API_KEYS_TABLE'])
-bins_table      = dynamodb.Table(os.environ['BINS_TABLE'])
-products_table  = dynamodb.Table(os.environ['PRODUCTS_TABLE'])
-inventory_table = dynamodb.Table(os.environ['INVENTORY_TABLE'])
-
-print("DynamoDB resources initialized successfully")
-
-def get_api_key_record(api_key: str):
-    print(f"Fetching API key record for key: {api_key}")
-    resp = api_keys_table.get_item(Key={'api_key': api_key}, ConsistentRead=True)
-    return resp.get('Item')
+# Table handles resolve on first use (see common.clients), so importing
+# `respond` alone costs no boto3 import or client construction.
+storing_table   = LazyTable('STORING_ORDERS_TABLE')
+packages_table  = LazyTable('PACKAGES_TABLE')
+items_table     = LazyTable('ITEMS_TABLE')
+api_keys_table  = LazyTable('API_KEYS_TABLE')
+bins_table      = LazyTable('BINS_TABLE')
+products_table  = LazyTable('PRODUCTS_TABLE')
+inventory_table = LazyTable('INVENTORY_TABLE')
 
 def respond(status_code: int, body: dict):
-    print(f"Responding with status code: {status_code}")
-    print(f"Response body: {body}")
-    return {
-        'statusCode': status_code,
-        'headers': {
-            "Content-Type": "application/json",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
-            "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token"
-        },
-        'body': json.dumps(body, default=str)
-    }
+    response = json_response(status_code, body)
+    print(f"Responding with status code: {status_code} ({len(response['body'])} bytes)")
+    return response
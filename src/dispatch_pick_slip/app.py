@@ -1,23 +1,17 @@
 import json
-import os
-import boto3
 from datetime import datetime
-
-dynamodb = boto3.resource('dynamodb')
-pick_slips_table_name = os.environ.get('PICK_SLIPS_TABLE')
-pick_slips_table = dynamodb.Table(pick_slips_table_name)
+from common.auth import resolve_identity
+from common.transitions import transition, TransitionConflict
 
 def lambda_handler(event, context):
     try:
         if event.get('httpMethod', 'POST') == 'GET':
             params = event.get('queryStringParameters') or {}
-            role = params.get('role')
-            employee_id = params.get('employee_id')
+            role, employee_id = resolve_identity(event, params)
             path_params = event.get('pathParameters', {})
         else:
             body = json.loads(event.get('body', '{}'))
-            role = body.get('role')
-            employee_id = body.get('employee_id')
+            role, employee_id = resolve_identity(event, body)
             path_params = event.get('pathParameters', {})
         if role != 'dispatcher':
             return {
@@ -31,24 +25,15 @@ def lambda_handler(event, context):
                 'body': json.dumps({'message': 'Bad Request: pick_slip_id is required.'})
             }
 
-        # Check if the pick slip exists
-        item_response = pick_slips_table.get_item(Key={'pick_slip_id': pick_slip_id}, ConsistentRead=True)
-        if 'Item' not in item_response:
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'message': 'Not Found: Pick slip not found.'})
-            }
-
-        # Update the slip status to DISPATCHED
+        # Update the slip status to DISPATCHED, only from READY-FOR-DISPATCH
         timestamp = datetime.now().isoformat()
-        pick_slips_table.update_item(
-            Key={'pick_slip_id': pick_slip_id},
-            UpdateExpression="SET pick_slip_status = :status, dispatched_date = :date",
-            ExpressionAttributeValues={
-                ':status': 'DISPATCHED',
-                ':date': timestamp
+        try:
+            transition('pick_slip', 'dispatch', pick_slip_id, sets={'dispatched_date': timestamp})
+        except TransitionConflict as e:
+            return {
+                'statusCode': 404 if e.not_found else 409,
+                'body': json.dumps({'message': str(e)})
             }
-        )
 
         return {
             'statusCode': 200,
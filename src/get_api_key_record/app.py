@@ -1,5 +1,6 @@
 import json
-from common.utils import api_keys_table, respond
+from common.utils import respond
+from common.auth import get_api_key_record
 
 def lambda_handler(event, context):
     # 쿼리스트링 또는 body에서 api_key 추출
@@ -16,7 +17,7 @@ def lambda_handler(event, context):
     if not api_key:
         return respond(400, {'message': 'api_key is required'})
 
-    rec = api_keys_table.get_item(Key={'api_key': api_key}, ConsistentRead=True).get('Item')
+    rec = get_api_key_record(api_key)
     if not rec:
         return respond(404, {'message': 'Not found'})
 
@@ -1,25 +1,41 @@
-import json
 import os
-import boto3
+import json
 from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+from common import clients
+from datetime import datetime, timedelta
+from common.auth import resolve_identity
+from common.serialize import dumps
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, Decimal):
-            return str(o)
-        return super(DecimalEncoder, self).default(o)
+table = clients.LazyTable('PICK_ORDERS_TABLE')
+# Sparse: ready_picker_id only exists while an order is READY-FOR-PICKING
+QUEUE_INDEX = 'PickerQueueIndex'
+CANDIDATE_PAGE_SIZE = 5
+# A claim nobody renewed for this long (device lost, picker walked away) can be taken over
+CLAIM_TTL_MINUTES = int(os.environ.get('PICK_CLAIM_TTL_MINUTES', '30'))
 
-dynamodb = boto3.resource('dynamodb')
-table_name = os.environ.get('PICK_ORDERS_TABLE')
-table = dynamodb.Table(table_name)
-GSI_NAME = 'PickerStatusDateIndex'
+def claim_pick_order(pick_order_id, claimant, now):
+    """
+    Claim (or renew) an order for one device. Returns the order, or None if
+    another device holds a claim younger than CLAIM_TTL_MINUTES.
+    """
+    stale = (now - timedelta(minutes=CLAIM_TTL_MINUTES)).isoformat()
+    try:
+        response = table.update_item(
+            Key={'pick_order_id': pick_order_id},
+            UpdateExpression="SET claimed_by = :c, claimed_date = :d",
+            ConditionExpression="pick_order_status = :ready AND (attribute_not_exists(claimed_by) "
+                                "OR claimed_by = :c OR attribute_not_exists(claimed_date) OR claimed_date < :stale)",
+            ExpressionAttributeValues={':c': claimant, ':d': now.isoformat(), ':stale': stale, ':ready': 'READY-FOR-PICKING'},
+            ReturnValues='ALL_NEW'
+        )
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return None
+    return response['Attributes']
 
 def lambda_handler(event, context):
     try:
         params = event.get('queryStringParameters') or {}
-        employee_id = params.get('employee_id')
-        role = params.get('role')
+        role, employee_id = resolve_identity(event, params)
         if not employee_id or not role:
             return {
                 'statusCode': 401,
@@ -41,14 +57,31 @@ def lambda_handler(event, context):
                 'body': json.dumps({'message': f"Forbidden: Role '{role}' is not authorized."})
             }
 
-        # Use scan for testing purposes
-        response = table.scan(
-            FilterExpression=boto3.dynamodb.conditions.Attr('picker_id').eq(employee_id) & boto3.dynamodb.conditions.Attr('pick_order_status').eq('READY-FOR-PICKING')
-        )
+        # Claims are per device when the client sends device_id; clients without
+        # one share a single claim per picker (the pre-device behaviour)
+        claimant = params.get('device_id') or f"employee:{employee_id}"
 
-        items = response.get('Items', [])
+        # Oldest READY-FOR-PICKING orders for this picker from the sparse queue index;
+        # claim the first one not held by another device.
+        now = datetime.now()
+        oldest_item = None
+        query_kwargs = {
+            'IndexName': QUEUE_INDEX,
+            'KeyConditionExpression': Key('ready_picker_id').eq(employee_id),
+            'ScanIndexForward': True,
+            'Limit': CANDIDATE_PAGE_SIZE
+        }
+        while oldest_item is None:
+            response = table.query(**query_kwargs)
+            for candidate in response.get('Items', []):
+                oldest_item = claim_pick_order(candidate['pick_order_id'], claimant, now)
+                if oldest_item:
+                    break
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
 
-        if not items:
+        if not oldest_item:
             return {
                 'statusCode': 404,
                 'headers': {
@@ -59,11 +92,6 @@ def lambda_handler(event, context):
                 'body': json.dumps({'message': 'No pick orders are currently ready for picking.'})
             }
 
-        # Sort by order_created_date to find the oldest one
-        items.sort(key=lambda x: x['order_created_date'])
-        
-        oldest_item = items[0]
-
         return {
             'statusCode': 200,
             'headers': {
@@ -71,7 +99,7 @@ def lambda_handler(event, context):
                 'Access-Control-Allow-Headers': 'Content-Type',
                 'Access-Control-Allow-Methods': 'OPTIONS,GET'
             },
-            'body': json.dumps(oldest_item, cls=DecimalEncoder)
+            'body': dumps(oldest_item)
         }
 
     except Exception as e:
@@ -0,0 +1,22 @@
+from common.projections import apply_records, CHUNK_RECORDS
+
+def lambda_handler(event, context):
+    """
+    DynamoDB Streams consumer for Packages, StoringOrders, PickOrders,
+    PickSlips, Inventory and Bins. Folds each batch into the Projections
+    table (common.projections), CHUNK_RECORDS records per transaction.
+    """
+    records = event.get('Records', [])
+    print(f"Received {len(records)} stream records.")
+    applied = 0
+    for i in range(0, len(records), CHUNK_RECORDS):
+        chunk = records[i:i + CHUNK_RECORDS]
+        try:
+            applied += apply_records(chunk)
+        except Exception as e:
+            # Earlier chunks are committed; Lambda retries from this record on
+            # and already applied records are skipped by their event markers.
+            print(f"Projection update failed: {e}")
+            return {"batchItemFailures": [{"itemIdentifier": chunk[0]['dynamodb']['SequenceNumber']}]}
+    print(f"Applied {applied} records to projections.")
+    return {"batchItemFailures": []}
@@ -0,0 +1,54 @@
+from boto3.dynamodb.conditions import Key
+from common.utils import respond
+from common.paging import read_page, PageParamError
+from common.auth import resolve_identity
+from common.projections import projections_table, status_counts, get_projection_items, ON_HAND, BIN_FILL
+
+# Dashboard numbers come from the stream-maintained Projections table
+# (see common.projections), so no request scans a source table.
+STATUS_TABLES = {
+    'packages': 'Packages',
+    'storing-orders': 'StoringOrders',
+    'pick-orders': 'PickOrders',
+    'pick-slips': 'PickSlips',
+}
+KEYED_VIEWS = {
+    'on-hand': (ON_HAND, 'product_id'),
+    'bin-fill': (BIN_FILL, 'bin_id'),
+}
+
+def shape(item, key_field):
+    row = {key_field: item.get('key')}
+    row.update({k: v for k, v in item.items() if k not in ('projection', 'key')})
+    return row
+
+def lambda_handler(event, context):
+    params = event.get('queryStringParameters') or {}
+    role, employee_id = resolve_identity(event, params)
+    if role != 'admin':
+        return respond(403, {'message': 'Forbidden'})
+    view = (event.get('pathParameters') or {}).get('view')
+
+    if view == 'status-counts':
+        requested = params.get('table')
+        if requested and requested not in STATUS_TABLES:
+            return respond(400, {'message': f"table must be one of {', '.join(STATUS_TABLES)}."})
+        names = [requested] if requested else list(STATUS_TABLES)
+        return respond(200, {'data': {name: status_counts(STATUS_TABLES[name]) for name in names}})
+
+    if view in KEYED_VIEWS:
+        projection, key_field = KEYED_VIEWS[view]
+        keys = [k.strip() for k in (params.get(key_field) or '').split(',') if k.strip()]
+        if keys:
+            items = get_projection_items(projection, keys)
+            return respond(200, {'data': [shape(item, key_field) for item in items], 'next_cursor': None})
+        try:
+            items, next_cursor = read_page(
+                projections_table.query, params,
+                KeyConditionExpression=Key('projection').eq(projection)
+            )
+        except PageParamError as e:
+            return respond(400, {'message': str(e)})
+        return respond(200, {'data': [shape(item, key_field) for item in items], 'next_cursor': next_cursor})
+
+    return respond(404, {'message': 'Unknown dashboard view.'})
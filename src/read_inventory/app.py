@@ -1,16 +1,20 @@
 import json
 from common.utils import inventory_table, respond
+from common.paging import read_page, PageParamError
+from common.auth import resolve_identity
 
 def lambda_handler(event, context):
     print("Received event:", event)
     params = event.get('queryStringParameters') or {}
-    role = params.get('role')
-    employee_id = params.get('employee_id')
+    role, employee_id = resolve_identity(event, params)
     print("Role:", role)
     if role != 'admin':
         print("Forbidden: not admin")
         return respond(403, {'message': 'Forbidden'})
     print("Scanning Inventory table...")
-    items = inventory_table.scan().get('Items', [])
+    try:
+        items, next_cursor = read_page(inventory_table.scan, params)
+    except PageParamError as e:
+        return respond(400, {'message': str(e)})
     print(f"Found {len(items)} inventory items.")
-    return respond(200, {'data': items})
+    return respond(200, {'data': items, 'next_cursor': next_cursor})
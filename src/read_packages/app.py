@@ -1,19 +1,24 @@
 import json
 from boto3.dynamodb.conditions import Key
 from common.utils import packages_table, respond
+from common.paging import read_page, PageParamError
+from common.parallel_scan import read_page_parallel
+from common.auth import resolve_identity
 
 def lambda_handler(event, context):
     params = event.get('queryStringParameters') or {}
-    role = params.get('role')
-    employee_id = params.get('employee_id')
-    if role == 'tq_employee':
-        resp = packages_table.query(
-            IndexName='TqEmployeeIndex',
-            KeyConditionExpression=Key('tq_employee_id').eq(employee_id)
-        )
-        items = resp.get('Items', [])
-    elif role == 'admin':
-        items = packages_table.scan().get('Items', [])
-    else:
-        return respond(403, {'message':'Forbidden'})
-    return respond(200, {'data': items})
+    role, employee_id = resolve_identity(event, params)
+    try:
+        if role == 'tq_employee':
+            items, next_cursor = read_page(
+                packages_table.query, params,
+                IndexName='TqEmployeeIndex',
+                KeyConditionExpression=Key('tq_employee_id').eq(employee_id)
+            )
+        elif role == 'admin':
+            items, next_cursor = read_page_parallel(packages_table, params)
+        else:
+            return respond(403, {'message':'Forbidden'})
+    except PageParamError as e:
+        return respond(400, {'message': str(e)})
+    return respond(200, {'data': items, 'next_cursor': next_cursor})
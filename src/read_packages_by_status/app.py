@@ -0,0 +1,42 @@
+from common.utils import packages_table, respond
+from common.paging import page_kwargs, PageParamError
+from common.auth import resolve_identity
+from common.sharding import query_status, status_index_enabled
+from common.transitions import TRANSITIONS
+
+# Worklists ("READY-FOR-BIN-ALLOCATION, oldest first", "BINNING since before
+# 10:00") from the write-sharded StatusDateIndex instead of a scan.
+ALLOWED_ROLES = ('admin', 'receiver', 'tq_employee', 'binner')
+PACKAGE_STATUSES = {
+    status
+    for (entity, _), (from_statuses, to_status) in TRANSITIONS.items() if entity == 'package'
+    for status in (*from_statuses, to_status)
+}
+
+def lambda_handler(event, context):
+    params = event.get('queryStringParameters') or {}
+    role, employee_id = resolve_identity(event, params)
+    if role not in ALLOWED_ROLES:
+        return respond(403, {'message': 'Forbidden'})
+    if not status_index_enabled():
+        return respond(503, {'message': 'StatusDateIndex is not deployed yet.'})
+    status = (event.get('pathParameters') or {}).get('status')
+    if status not in PACKAGE_STATUSES:
+        return respond(400, {'message': f"status must be one of {', '.join(sorted(PACKAGE_STATUSES))}."})
+    order = params.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        return respond(400, {'message': 'order must be asc or desc.'})
+    since, until = params.get('since'), params.get('until')
+    if since and until and since > until:
+        return respond(400, {'message': 'since must not be after until.'})
+    try:
+        # cursor is the multi-shard token from query_status, not a single key
+        page = page_kwargs({k: v for k, v in params.items() if k != 'cursor'})
+        items, next_cursor = query_status(
+            packages_table, ('package_id',), status,
+            since=since, until=until, limit=page.pop('Limit'), cursor=params.get('cursor'),
+            descending=order == 'desc', **page
+        )
+    except PageParamError as e:
+        return respond(400, {'message': str(e)})
+    return respond(200, {'data': items, 'next_cursor': next_cursor})
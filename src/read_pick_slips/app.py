@@ -1,60 +1,42 @@
 import json
-import boto3
-import os
-import decimal
+from common import clients
+from common.export import export_table
+from common.parallel_scan import parallel_scan
+from common.auth import resolve_identity
+from common.serialize import cors_headers, dumps
 
-# Helper class to convert a DynamoDB item to JSON.
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, decimal.Decimal):
-            if o % 1 > 0:
-                return float(o)
-            else:
-                return int(o)
-        return super(DecimalEncoder, self).default(o)
-
-dynamodb = boto3.resource('dynamodb')
-table_name = os.environ['PICK_SLIPS_TABLE']
-table = dynamodb.Table(table_name)
+HEADERS = cors_headers('OPTIONS,GET')
+table = clients.LazyTable('PICK_SLIPS_TABLE')
 
 def lambda_handler(event, context):
     print(json.dumps(event))
     params = event.get('queryStringParameters') or {}
-    role = params.get('role')
-    employee_id = params.get('employee_id')
+    role, employee_id = resolve_identity(event, params)
     if role != 'admin':
         return {
             'statusCode': 403,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-                'Access-Control-Allow-Methods': 'OPTIONS,GET'
-            },
+            'headers': HEADERS,
             'body': json.dumps({'message': 'Forbidden: You do not have permission to access this resource.'})
         }
     try:
-        response = table.scan()
-        items = response.get('Items', [])
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response.get('Items', []))
+        if params.get('export') == 'ndjson':
+            # Stream the whole table to a gzip NDJSON object instead of one JSON body
+            handle = export_table(table, 'pick-slips')
+            return {
+                'statusCode': 200,
+                'headers': HEADERS,
+                'body': json.dumps(handle)
+            }
+        items = parallel_scan(table)
         return {
             'statusCode': 200,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-                'Access-Control-Allow-Methods': 'OPTIONS,GET'
-            },
-            'body': json.dumps(items, cls=DecimalEncoder)
+            'headers': HEADERS,
+            'body': dumps(items)
         }
     except Exception as e:
         print(e)
         return {
             'statusCode': 500,
-            'headers': {
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-                'Access-Control-Allow-Methods': 'OPTIONS,GET'
-            },
+            'headers': HEADERS,
             'body': json.dumps({'message': 'Internal Server Error'})
         } 
\ No newline at end of file
@@ -0,0 +1,41 @@
+from common.utils import respond
+from common.auth import resolve_identity
+from common.stock import bins_for_products
+
+ALLOWED_ROLES = ('admin', 'picker')
+MAX_PRODUCTS = 100
+
+def parse_products(params):
+    """
+    product_id=PROD1,PROD2:5 -> {'PROD1': min_quantity, 'PROD2': 5}.
+    A ':N' suffix overrides min_quantity for that product.
+    """
+    default_min = int(params.get('min_quantity') or 1)
+    products = {}
+    for entry in (params.get('product_id') or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        product_id, _, min_quantity = entry.partition(':')
+        products[product_id] = int(min_quantity) if min_quantity else default_min
+    return products
+
+def lambda_handler(event, context):
+    params = event.get('queryStringParameters') or {}
+    role, employee_id = resolve_identity(event, params)
+    if role not in ALLOWED_ROLES:
+        return respond(403, {'message': 'Forbidden'})
+    try:
+        products = parse_products(params)
+        limit = int(params['limit']) if params.get('limit') else None
+    except ValueError:
+        return respond(400, {'message': 'min_quantity and limit must be integers.'})
+    if not products:
+        return respond(400, {'message': 'product_id is required.'})
+    if len(products) > MAX_PRODUCTS:
+        return respond(400, {'message': f'At most {MAX_PRODUCTS} products per request.'})
+    if (limit is not None and limit <= 0) or any(n <= 0 for n in products.values()):
+        return respond(400, {'message': 'min_quantity and limit must be positive.'})
+
+    print(f"Stock lookup for {len(products)} products (limit={limit})")
+    return respond(200, {'data': bins_for_products(products, limit=limit)})
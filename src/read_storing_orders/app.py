@@ -1,28 +1,33 @@
 import json
 from boto3.dynamodb.conditions import Key
 from common.utils import storing_table, respond
+from common.paging import read_page, PageParamError
+from common.auth import resolve_identity
 
 def lambda_handler(event, context):
     print("Received event:", event)
     params = event.get('queryStringParameters') or {}
-    eid  = params.get('employee_id')
-    role = params.get('role')
+    role, eid = resolve_identity(event, params)
     print("Employee ID:", eid)
     print("Auth role:", role)
-    if role == 'receiver':
-        print("Processing receiver role request")
-        resp = storing_table.query(
-            IndexName='ReceiverIndex',
-            KeyConditionExpression=Key('receiver_id').eq(eid)
-        )
-        items = resp.get('Items', [])
-        print("Found items for receiver:", len(items))
-    elif role == 'admin':
-        print("Processing admin role request")
-        items = storing_table.scan().get('Items', [])
-        print("Found items for admin:", len(items))
-    else:
-        print("Forbidden access attempt")
-        return respond(403, {'message':'Forbidden'})
+    try:
+        if role == 'receiver':
+            print("Processing receiver role request")
+            items, next_cursor = read_page(
+                storing_table.query, params,
+                IndexName='ReceiverIndex',
+                KeyConditionExpression=Key('receiver_id').eq(eid)
+            )
+            print("Found items for receiver:", len(items))
+        elif role == 'admin':
+            print("Processing admin role request")
+            items, next_cursor = read_page(storing_table.scan, params)
+            print("Found items for admin:", len(items))
+        else:
+            print("Forbidden access attempt")
+            return respond(403, {'message':'Forbidden'})
+    except PageParamError as e:
+        print("Invalid paging parameters:", e)
+        return respond(400, {'message': str(e)})
     print("Returning response with items")
-    return respond(200, {'data': items})
+    return respond(200, {'data': items, 'next_cursor': next_cursor})
@@ -0,0 +1,60 @@
+import json
+from common.utils import respond
+from common.auth import resolve_identity
+from common.receiving import MAX_TRANSACTION_ITEMS, parse_request, inspect, get_orders, commit_many
+
+MAX_ORDERS = 200
+
+def lambda_handler(event, context):
+    body = json.loads(event.get('body') or '{}')
+    role, employee_id = resolve_identity(event, body)
+    if role != 'receiver':
+        return respond(403, {'message': 'Forbidden'})
+    orders = body.get('orders')
+    if not isinstance(orders, list) or not orders:
+        return respond(400, {'message': 'orders must be a non-empty list.'})
+    if len(orders) > MAX_ORDERS:
+        return respond(400, {'message': f'At most {MAX_ORDERS} orders per request.'})
+
+    # One result per request entry, in request order
+    results = [None] * len(orders)
+    requested = {}
+    for i, entry in enumerate(orders):
+        try:
+            sid, fields = parse_request(entry)
+        except Exception:
+            sid = entry.get('storing_order_id') if isinstance(entry, dict) else None
+            results[i] = {'storing_order_id': sid, 'status': 400, 'message': 'Invalid input'}
+            continue
+        if sid in requested:
+            results[i] = {'storing_order_id': sid, 'status': 400, 'message': 'Duplicate storing_order_id in request.'}
+            continue
+        requested[sid] = (i, fields)
+
+    found = get_orders(list(requested))
+    plans, details = [], {}
+    for sid, (i, fields) in requested.items():
+        order = found.get(sid)
+        if not order:
+            results[i] = {'storing_order_id': sid, 'status': 404, 'message': 'Order not found'}
+            continue
+        steps, details[sid] = inspect(sid, order, fields, employee_id)
+        if len(steps) > MAX_TRANSACTION_ITEMS:
+            results[i] = {'storing_order_id': sid, 'status': 400,
+                          'message': 'Order has too many packages for one transaction.'}
+            continue
+        plans.append((sid, steps))
+
+    print(f"Bulk receive: {len(orders)} orders, {len(plans)} to commit")
+    for sid, error in commit_many(plans).items():
+        i = requested[sid][0]
+        if error:
+            results[i] = {'storing_order_id': sid, 'status': error[0], 'message': error[1]}
+        elif details[sid]:
+            results[i] = {'storing_order_id': sid, 'status': 400, 'message': 'Inspection failed',
+                          'discrepancy_detail': details[sid]}
+        else:
+            results[i] = {'storing_order_id': sid, 'status': 200, 'message': 'Order received'}
+
+    received = sum(1 for r in results if r['status'] == 200)
+    return respond(200, {'received': received, 'failed': len(results) - received, 'data': results})
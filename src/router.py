@@ -0,0 +1,102 @@
+import importlib
+
+# Single entry point for the REST API: maps method + path onto the existing
+# per-endpoint lambda_handler functions so one warm function can serve every
+# screen. Handler modules are imported on first use, so a container only pays
+# for the endpoints it actually serves.
+ROUTES = [
+    ('POST', '/bin-allocation', 'bin_allocation.app'),
+    ('GET',  '/storing-orders', 'read_storing_orders.app'),
+    ('POST', '/storing-orders/receive', 'receive_order.app'),
+    ('POST', '/storing-orders/receive-bulk', 'receive_orders_bulk.app'),
+    ('PUT',  '/storing-orders/discrepancy', 'update_discrepancy.app'),
+    ('GET',  '/packages', 'read_packages.app'),
+    ('GET',  '/packages/status/{status}', 'read_packages_by_status.app'),
+    ('POST', '/packages/{package_id}/close-tq', 'close_tq.app'),
+    ('POST', '/packages/{package_id}/start-tq', 'start_tq.app'),
+    ('POST', '/packages/{package_id}/close-binning', 'close_binning.app'),
+    ('GET',  '/package/{package_id}', 'get_package.lambda_function'),
+    ('GET',  '/api-key', 'get_api_key_record.app'),
+    ('POST', '/api-key', 'get_api_key_record.app'),
+    ('POST', '/tq-quality-check', 'tq_quality_check.app'),
+    ('GET',  '/inventory', 'read_inventory.app'),
+    ('GET',  '/stock', 'read_stock.app'),
+    ('GET',  '/dashboard/{view}', 'read_dashboard.app'),
+    ('GET',  '/pick-slips', 'read_pick_slips.app'),
+    ('POST', '/pick-slips/{pick_slip_id}/dispatch', 'dispatch_pick_slip.app'),
+    ('GET',  '/pick-orders', 'read_pick_orders.app'),
+    ('POST', '/pick-orders/{pick_order_id}/close', 'close_pick_order.app'),
+    ('GET',  '/next-pick-order', 'get_next_pick_order.app'),
+    ('POST', '/packing/start', 'start_packing.app'),
+    ('POST', '/packing/{pick_slip_id}/close', 'close_packing.app'),
+]
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token",
+    "Access-Control-Allow-Methods": "OPTIONS,GET,POST,PUT"
+}
+
+_handlers = {}
+
+
+def _split(path):
+    return [segment for segment in (path or '').split('/') if segment]
+
+
+_COMPILED = [(method, template, _split(template), module) for method, template, module in ROUTES]
+
+
+def match(path):
+    """All (method, template, module, path_params) whose template matches `path`."""
+    segments = _split(path)
+    matches = []
+    for method, template, parts, module in _COMPILED:
+        if len(parts) != len(segments):
+            continue
+        params = {}
+        for part, segment in zip(parts, segments):
+            if part.startswith('{') and part.endswith('}'):
+                params[part[1:-1]] = segment
+            elif part != segment:
+                break
+        else:
+            matches.append((method, template, module, params))
+    # Literal segments win over {params} when two templates fit the same path
+    matches.sort(key=lambda m: len(m[3]))
+    return matches
+
+
+def _handler(module):
+    if module not in _handlers:
+        _handlers[module] = importlib.import_module(module).lambda_handler
+    return _handlers[module]
+
+
+def _reply(status_code, body, headers=None):
+    return {
+        'statusCode': status_code,
+        'headers': {**CORS_HEADERS, 'Content-Type': 'application/json', **(headers or {})},
+        'body': body
+    }
+
+
+def lambda_handler(event, context):
+    method = (event.get('httpMethod') or 'GET').upper()
+    path = event.get('path') or '/'
+    candidates = match(path)
+    if not candidates:
+        return _reply(404, '{"message": "Not Found"}')
+
+    # CORS preflight is answered here instead of by a separate OPTIONS function
+    if method == 'OPTIONS':
+        return {'statusCode': 200, 'headers': dict(CORS_HEADERS), 'body': ''}
+
+    for route_method, template, module, params in candidates:
+        if route_method == method:
+            event = dict(event, resource=template, pathParameters={**(event.get('pathParameters') or {}), **params})
+            event['pathParameters'].pop('proxy', None)
+            return _handler(module)(event, context)
+
+    allowed = ', '.join(sorted({m for m, _, _, _ in candidates} | {'OPTIONS'}))
+    return _reply(405, '{"message": "Method Not Allowed"}', {'Allow': allowed})
@@ -1,27 +1,42 @@
 import json
-import os
-import boto3
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Key
 from datetime import datetime
-from operator import itemgetter
-from decimal import Decimal
+from common import clients
+from common.auth import resolve_identity
+from common.serialize import dumps
+from common.sharding import shard_set
 
-class DecimalEncoder(json.JSONEncoder):
-    def default(self, o):
-        if isinstance(o, Decimal):
-            return str(o)
-        return super(DecimalEncoder, self).default(o)
+pick_slips_table = clients.LazyTable('PICK_SLIPS_TABLE')
+# Sparse: ready_packing_zone only exists while a slip is READY-FOR-PACKING
+QUEUE_INDEX = 'PackingQueueIndex'
+CANDIDATE_PAGE_SIZE = 5
 
-dynamodb = boto3.resource('dynamodb')
-pick_slips_table_name = os.environ.get('PICK_SLIPS_TABLE')
-pick_slips_table = dynamodb.Table(pick_slips_table_name)
+def claim_pick_slip(pick_slip_id, employee_id, timestamp):
+    """Move a READY-FOR-PACKING slip to PACKING-IN-PROGRESS. Returns None if someone else claimed it."""
+    shard_clause, shard_values = shard_set('PACKING-IN-PROGRESS', pick_slip_id, timestamp)
+    try:
+        response = pick_slips_table.update_item(
+            Key={'pick_slip_id': pick_slip_id},
+            UpdateExpression=f"SET pick_slip_status = :status, packing_start_date = :date, packer_id = :packer, {shard_clause} REMOVE ready_packing_zone",
+            ConditionExpression="pick_slip_status = :ready",
+            ExpressionAttributeValues={
+                ':status': 'PACKING-IN-PROGRESS',
+                ':date': timestamp,
+                ':packer': employee_id,
+                ':ready': 'READY-FOR-PACKING',
+                **shard_values
+            },
+            ReturnValues="ALL_NEW"
+        )
+    except pick_slips_table.meta.client.exceptions.ConditionalCheckFailedException:
+        return None
+    return response['Attributes']
 
 def lambda_handler(event, context):
     try:
         print(f"Lambda function started - Request ID: {context.aws_request_id}")
         body = json.loads(event.get('body', '{}'))
-        employee_id = body.get('employee_id')
-        role = body.get('role')
+        role, employee_id = resolve_identity(event, body)
         print(f"Authentication details - Employee ID: {employee_id}, Role: {role}")
         if not employee_id or not role:
             print("Unauthorized: Missing authentication details")
@@ -44,45 +59,37 @@ def lambda_handler(event, context):
                 'body': json.dumps({'message': 'Bad Request: packing_zone is required.'})
             }
 
-        # Scan for slips ready for packing in the given zone
-        print(f"Scanning for pick slips ready for packing in zone: {packing_zone}")
-        scan_response = pick_slips_table.scan(
-            FilterExpression=Attr('packing_zone').eq(packing_zone) & Attr('pick_slip_status').eq('READY-FOR-PACKING')
-        )
-
-        ready_slips = scan_response.get('Items', [])
-        print(f"Found {len(ready_slips)} pick slips ready for packing")
+        # Oldest READY-FOR-PACKING slips in the zone from the sparse queue index;
+        # claim the first one no other packer got to first.
+        print(f"Querying {QUEUE_INDEX} for pick slips ready for packing in zone: {packing_zone}")
+        timestamp = datetime.now().isoformat()
+        claimed = None
+        query_kwargs = {
+            'IndexName': QUEUE_INDEX,
+            'KeyConditionExpression': Key('ready_packing_zone').eq(packing_zone),
+            'ScanIndexForward': True,
+            'Limit': CANDIDATE_PAGE_SIZE
+        }
+        while claimed is None:
+            response = pick_slips_table.query(**query_kwargs)
+            for candidate in response.get('Items', []):
+                claimed = claim_pick_slip(candidate['pick_slip_id'], employee_id, timestamp)
+                if claimed:
+                    break
+                print(f"Pick slip {candidate['pick_slip_id']} was claimed by another packer, trying next")
+            if 'LastEvaluatedKey' not in response:
+                break
+            query_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
 
-        if not ready_slips:
+        if not claimed:
             print(f"No pick slips ready for packing in zone {packing_zone}")
             return {
                 'statusCode': 404,
                 'body': json.dumps({'message': f'Not Found: No pick slips ready for packing in zone {packing_zone}.'})
             }
 
-        # Find the oldest slip based on pick_slip_created_date
-        oldest_slip = sorted(ready_slips, key=itemgetter('pick_slip_created_date'))[0]
-        pick_slip_id = oldest_slip['pick_slip_id']
-        
-        print(f"Selected oldest pick slip: {pick_slip_id}")
-        
-        # Update the slip to start packing
-        timestamp = datetime.now().isoformat()
-        print(f"Updating pick slip {pick_slip_id} to PACKING-IN-PROGRESS status")
-        
-        update_response = pick_slips_table.update_item(
-            Key={'pick_slip_id': pick_slip_id},
-            UpdateExpression="SET pick_slip_status = :status, packing_start_date = :date, packer_id = :packer",
-            ExpressionAttributeValues={
-                ':status': 'PACKING-IN-PROGRESS',
-                ':date': timestamp,
-                ':packer': employee_id
-            },
-            ReturnValues="ALL_NEW"
-        )
+        print(f"Successfully updated pick slip {claimed['pick_slip_id']} - Status: PACKING-IN-PROGRESS, Packer: {employee_id}")
 
-        print(f"Successfully updated pick slip {pick_slip_id} - Status: PACKING-IN-PROGRESS, Packer: {employee_id}")
-        
         return {
             'statusCode': 200,
             'headers': {
@@ -90,7 +97,7 @@ def lambda_handler(event, context):
                 'Access-Control-Allow-Headers': 'Content-Type',
                 'Access-Control-Allow-Methods': 'OPTIONS,POST'
             },
-            'body': json.dumps(update_response.get('Attributes'), cls=DecimalEncoder)
+            'body': dumps(claimed)
         }
 
     except Exception as e:
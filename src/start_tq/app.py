@@ -1,40 +1,33 @@
 import json
 from datetime import datetime
-from common.utils import packages_table, respond
+from common.utils import respond
+from common.auth import resolve_identity
+from common.transitions import transition, TransitionConflict
 
 def lambda_handler(event, context):
     try:
         if event.get('httpMethod', 'POST') == 'GET':
             params = event.get('queryStringParameters') or {}
-            role = params.get('role')
-            employee_id = params.get('employee_id')
+            role, employee_id = resolve_identity(event, params)
             path_params = event.get('pathParameters', {})
         else:
             body = json.loads(event.get('body', '{}'))
-            role = body.get('role')
-            employee_id = body.get('employee_id')
+            role, employee_id = resolve_identity(event, body)
             path_params = event.get('pathParameters', {})
         package_id = path_params.get('package_id')
         if not all([employee_id, role, package_id]):
             return respond(400, {'message': 'Bad Request: Missing required parameters.'})
 
-        # 패키지 조회
-        package_response = packages_table.get_item(Key={'package_id': package_id}, ConsistentRead=True)
-        package = package_response.get('Item')
-        if not package:
-            return respond(404, {'message': 'Package not found.'})
-
-        # tq_start_date 업데이트
+        # tq_start_date 기록 + TQ-CHECKING 전환 (조건부 update 한 번, 사전 조회 없음)
+        # 재시작(TQ-FAILED 등)이면 스캔 수를 0으로; 이전 run의 태그는 tq_start_date가 달라 다시 셀 수 있음
         timestamp = datetime.now().isoformat()
-        packages_table.update_item(
-            Key={'package_id': package_id},
-            UpdateExpression="SET tq_start_date = :date",
-            ExpressionAttributeValues={':date': timestamp}
-        )
-
-        # 최신 정보 다시 조회
-        updated = packages_table.get_item(Key={'package_id': package_id}, ConsistentRead=True)
-        return respond(200, {'data': updated.get('Item')})
+        try:
+            package = transition('package', 'start_tq', package_id, sets={
+                'tq_start_date': timestamp, 'tq_scanned_quantity': 0
+            })
+        except TransitionConflict as e:
+            return respond(404 if e.not_found else 409, {'message': str(e)})
+        return respond(200, {'data': package})
 
     except Exception as e:
         print(f"Error: {e}")
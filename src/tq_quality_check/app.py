@@ -1,34 +1,14 @@
 import json, datetime
-from common.utils import packages_table, respond
-from boto3.dynamodb.conditions import Attr
+from common.utils import respond
+from common.auth import resolve_identity
+from common.transitions import transition, TransitionConflict
 
 def lambda_handler(event, context):
     body = json.loads(event.get('body', '{}'))
-    role = body.get('role')
-    employee_id = body.get('employee_id')
+    role, employee_id = resolve_identity(event, body)
     if role != 'tq_employee':
         return respond(403, {'message': 'Unauthorized. (role != tq_employee)'})
 
-    # Change all records with status TQ-CHECKING to TQ-FAILED
-    scan_kwargs = {
-        'FilterExpression': Attr('status').eq('TQ-CHECKING')
-    }
-    done = False
-    start_key = None
-    while not done:
-        if start_key:
-            scan_kwargs['ExclusiveStartKey'] = start_key
-        response = packages_table.scan(**scan_kwargs)
-        for item in response.get('Items', []):
-            packages_table.update_item(
-                Key={'package_id': item['package_id']},
-                UpdateExpression="SET #s=:s",
-                ExpressionAttributeNames={'#s': 'status'},
-                ExpressionAttributeValues={':s': 'TQ-FAILED'}
-            )
-        start_key = response.get('LastEvaluatedKey', None)
-        done = start_key is None
-
     # Parse Input
     try:
         body = json.loads(event['body'])
@@ -38,34 +18,16 @@ def lambda_handler(event, context):
     except Exception:
         return respond(400, {'message': 'Invalid input values.'})
 
-    # Retrieve Package Record
-    r = packages_table.get_item(Key={'package_id': package_id}, ConsistentRead=True)
-    package = r.get('Item')
-    if not package:
-        return respond(404, {'message': 'Package with this package_id not found.'})
-
-    # Status Check and Change
-    if package.get('status') != 'READY-FOR-TQ':
-        return respond(400, {'message': f"Package status is not READY-FOR-TQ. (Current status: {package.get('status')})"})
+    if flag not in ('pass', 'fail'):
+        return respond(400, {'message': 'Flag must be either pass or fail.'})
 
+    # Status Change: one conditional update, only from READY-FOR-TQ
     now = datetime.datetime.utcnow().isoformat()
-
-    # Status Update
-    if flag == 'pass':
-        packages_table.update_item(
-            Key={'package_id': package_id},
-            UpdateExpression="SET #s=:s, #t=:t, #d=:d",
-            ExpressionAttributeNames={'#s': 'status', '#t': 'tq_staff_id', '#d': 'tq_quality_check_date'},
-            ExpressionAttributeValues={':s': 'READY-FOR-RFID-ATTACH', ':t': employee_id, ':d': now}
-        )
-        return respond(200, {'message': 'Package status changed to READY-FOR-RFID-ATTACH.'})
-    elif flag == 'fail':
-        packages_table.update_item(
-            Key={'package_id': package_id},
-            UpdateExpression="SET #s=:s, #t=:t, #d=:d, #desc=:desc",
-            ExpressionAttributeNames={'#s': 'status', '#t': 'tq_staff_id', '#d': 'tq_quality_check_date', '#desc': 'tq_fail_description'},
-            ExpressionAttributeValues={':s': 'TQ-QUALITY-CHECK-FAILED', ':t': employee_id, ':d': now, ':desc': description}
-        )
-        return respond(200, {'message': 'Package status changed to TQ-QUALITY-CHECK-FAILED.'})
-    else:
-        return respond(400, {'message': 'Flag must be either pass or fail.'})
+    sets = {'tq_staff_id': employee_id, 'tq_quality_check_date': now}
+    if flag == 'fail':
+        sets['tq_fail_description'] = description
+    try:
+        package = transition('package', f'tq_{flag}', package_id, sets=sets)
+    except TransitionConflict as e:
+        return respond(404 if e.not_found else 409, {'message': str(e)})
+    return respond(200, {'message': f"Package status changed to {package['status']}."})
@@ -0,0 +1,62 @@
+import os
+from datetime import datetime, timedelta
+from boto3.dynamodb.conditions import Key
+from common import clients
+from common.bulk import run_updates
+from common.transitions import update_request
+
+# Scheduled sweep for TQ runs that never finished: packages still TQ-CHECKING
+# whose tq_start_date is older than TQ_STALE_MINUTES go to TQ-FAILED. Only the
+# sparse TqCheckingIndex is read (see transitions.SPARSE_KEYS), so a run costs
+# the number of packages in TQ, not the size of Packages.
+TQ_CHECKING_INDEX = 'TqCheckingIndex'
+STALE_MINUTES = float(os.environ.get('TQ_STALE_MINUTES', '60'))
+PAGE_SIZE = int(os.environ.get('TQ_REAPER_PAGE_SIZE', '100'))
+MAX_PACKAGES = int(os.environ.get('TQ_REAPER_MAX_PACKAGES', '2000'))
+# Stop early rather than be cut off mid-batch by the Lambda timeout
+MIN_REMAINING_MS = 5000
+
+packages_table = clients.LazyTable('PACKAGES_TABLE')
+
+def stale_pages(cutoff):
+    """Pages of package_ids started before `cutoff`, oldest first."""
+    kwargs = {
+        'IndexName': TQ_CHECKING_INDEX,
+        'KeyConditionExpression': Key('tq_checking').eq('TQ-CHECKING') & Key('tq_start_date').lt(cutoff),
+        'ProjectionExpression': 'package_id',
+        'Limit': PAGE_SIZE
+    }
+    while True:
+        response = packages_table.query(**kwargs)
+        yield [item['package_id'] for item in response.get('Items', [])]
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def lambda_handler(event, context):
+    cutoff = (datetime.now() - timedelta(minutes=STALE_MINUTES)).isoformat()
+    reaped = skipped = error_count = 0
+    for package_ids in stale_pages(cutoff):
+        if not package_ids:
+            continue
+        # The index is eventually consistent, so the write re-checks both the
+        # status and the staleness; a package restarted since the query is skipped.
+        requests = [
+            update_request('package', 'tq_timeout', package_id,
+                           condition="tq_start_date < :cutoff", values={':cutoff': cutoff})
+            for package_id in package_ids
+        ]
+        failed = run_updates(packages_table, requests)
+        # A failed condition means the package moved on; anything else is an error to retry next run
+        errors = [(key['package_id'], code) for key, code in failed if code != 'ConditionalCheckFailedException']
+        if errors:
+            print(f"TQ reaper: {len(errors)} packages could not be updated: {errors[:10]}")
+        reaped += len(package_ids) - len(failed)
+        skipped += len(failed) - len(errors)
+        error_count += len(errors)
+        if reaped + skipped + error_count >= MAX_PACKAGES:
+            break
+        if context and context.get_remaining_time_in_millis() < MIN_REMAINING_MS:
+            break
+    print(f"TQ reaper: {reaped} packages set to TQ-FAILED, {skipped} skipped, {error_count} errors (started before {cutoff})")
+    return {'reaped': reaped, 'skipped': skipped, 'errors': error_count, 'cutoff': cutoff}
@@ -1,57 +1,148 @@
-import boto3
 import json
-import os
+from datetime import datetime
+from common import clients
+from common.transitions import transition, TransitionConflict
 
-dynamodb = boto3.resource('dynamodb')
-items_table = dynamodb.Table(os.environ['ITEMS_TABLE'])
-packages_table = dynamodb.Table(os.environ['PACKAGES_TABLE'])
+items_table = clients.LazyTable('ITEMS_TABLE')
+packages_table = clients.LazyTable('PACKAGES_TABLE')
+
+def conditional_check_failed():
+    return clients.client('dynamodb').exceptions.ConditionalCheckFailedException
+
+def load_session(package_id):
+    """
+    (status, tq_start_date) of the package, starting a TQ run first if the
+    package is still READY-FOR-RFID-ATTACH (the first scan starts it).
+    """
+    item = packages_table.get_item(
+        Key={'package_id': package_id}, ConsistentRead=True,
+        ProjectionExpression='#s, tq_start_date', ExpressionAttributeNames={'#s': 'status'}
+    ).get('Item')
+    if not item:
+        return None, None
+    if item.get('status') == 'READY-FOR-RFID-ATTACH':
+        try:
+            item = transition('package', 'scan_start', package_id, sets={
+                'tq_start_date': datetime.now().isoformat(), 'tq_scanned_quantity': 0
+            })
+        except TransitionConflict:
+            # Started (or moved on) concurrently; read what it is now
+            return load_session(package_id)
+    return item.get('status'), item.get('tq_start_date')
+
+def claim_rfid(rfid_id, package_id, tq_date, tq_start_date):
+    """
+    Record the tag in Items for this TQ run. Returns False if it was already
+    counted in the same run; reads from an earlier run (or seed rows) do not
+    block a restarted TQ.
+    """
+    try:
+        items_table.put_item(
+            Item={
+                'rfid_id': rfid_id,
+                'package_id': package_id,
+                'status': 'READY-FOR-BIN-ALLOCATION',
+                'tq_date': tq_date,
+                'tq_start_date': tq_start_date
+            },
+            ConditionExpression="attribute_not_exists(rfid_id) OR NOT (package_id = :p AND tq_start_date = :start)",
+            ExpressionAttributeValues={':p': package_id, ':start': tq_start_date}
+        )
+        return True
+    except conditional_check_failed():
+        return False
+
+def release_rfid(rfid_id, package_id, tq_start_date):
+    items_table.delete_item(
+        Key={'rfid_id': rfid_id},
+        ConditionExpression="package_id = :p AND tq_start_date = :start",
+        ExpressionAttributeValues={':p': package_id, ':start': tq_start_date}
+    )
+
+def count_scan(package_id, tq_start_date):
+    """ADD one to tq_scanned_quantity and return the new count, or None if that TQ run is no longer TQ-CHECKING."""
+    try:
+        response = packages_table.update_item(
+            Key={'package_id': package_id},
+            UpdateExpression="ADD tq_scanned_quantity :one",
+            # Same run the tag was claimed for; a late read for a binned, failed or
+            # restarted package is not counted
+            ConditionExpression="#s = :checking AND tq_start_date = :start",
+            ExpressionAttributeNames={'#s': 'status'},
+            ExpressionAttributeValues={':one': 1, ':checking': 'TQ-CHECKING', ':start': tq_start_date},
+            ReturnValues='UPDATED_NEW'
+        )
+    except conditional_check_failed():
+        return None
+    return response['Attributes']['tq_scanned_quantity']
+
+def complete_if_counted(package_id, tq_start_date, scanned):
+    """Move the package to READY-FOR-BIN-ALLOCATION once the count reaches quantity."""
+    try:
+        transition('package', 'tq_complete', package_id,
+                   condition="tq_start_date = :start AND quantity = :scanned AND tq_scanned_quantity = :scanned",
+                   values={':start': tq_start_date, ':scanned': scanned})
+        return True
+    except TransitionConflict:
+        return False
+
+def process_read(rfid_id, package_id, tq_date, sessions):
+    """Count one tag read; `sessions` caches (status, tq_start_date) per package for this batch."""
+    for attempt in range(2):
+        if package_id not in sessions or attempt:
+            sessions[package_id] = load_session(package_id)
+        status, tq_start_date = sessions[package_id]
+        if status != 'TQ-CHECKING' or not tq_start_date:
+            print(f"Package {package_id} not found or not taking TQ scans ({status}).")
+            return
+
+        # 1. Deduplicate within this TQ run: a re-read tag never counts twice
+        if not claim_rfid(rfid_id, package_id, tq_date, tq_start_date):
+            print(f"RFID {rfid_id} already counted, skipping.")
+            return
+
+        # 2. Atomic tq_scanned_quantity + 1
+        try:
+            scanned = count_scan(package_id, tq_start_date)
+        except Exception:
+            release_rfid(rfid_id, package_id, tq_start_date)
+            raise
+        if scanned is None:
+            # Run ended or restarted since it was read; retry once against the current run
+            release_rfid(rfid_id, package_id, tq_start_date)
+            continue
+
+        # 3. Status transition when the last tag arrives
+        if complete_if_counted(package_id, tq_start_date, scanned):
+            print(f"Package {package_id} is now READY-FOR-BIN-ALLOCATION ({scanned} scanned).")
+        else:
+            print(f"Updated package {package_id}'s tq_scanned_quantity to {scanned}.")
+        return
+    print(f"Package {package_id} is no longer taking TQ scans.")
 
 def lambda_handler(event, context):
     print("Lambda function has started.")
     print(f"Received event: {event}")
-    
+
+    failures = []
+    sessions = {}
     for record in event['Records']:
         print(f"Processing record: {record}")
-        body = json.loads(record['body'])
-        rfid_id = body['rfid_id']
-        package_id = body['package_id']
-        tq_date = body['tq_date']
-        print(f"RFID ID: {rfid_id}, Package ID: {package_id}, TQ Date: {tq_date}")
-        
-        # 1. Query Packages table with package_id
-        package_resp = packages_table.get_item(Key={'package_id': package_id}, ConsistentRead=True)
-        package = package_resp.get('Item')
-        if not package:
-            print(f"Package {package_id} not found.")
+        try:
+            body = json.loads(record['body'])
+            rfid_id = body['rfid_id']
+            package_id = body['package_id']
+            tq_date = body['tq_date']
+        except Exception as e:
+            print(f"Skipping malformed record {record.get('messageId')}: {e}")
             continue
-        
-        # 2. tq_scanned_quantity + 1
-        tq_scanned_quantity = package.get('tq_scanned_quantity', 0) + 1
-        quantity = package.get('quantity', 0)
-        
-        # 3. Determine status
-        if tq_scanned_quantity == quantity:
-            new_status = 'READY-FOR-BIN-ALLOCATION'
-        else:
-            new_status = 'TQ-CHECKING'
-        
-        # 4. Update Packages table
-        packages_table.update_item(
-            Key={'package_id': package_id},
-            UpdateExpression="SET tq_scanned_quantity = :q, #s = :s",
-            ExpressionAttributeNames={'#s': 'status'},
-            ExpressionAttributeValues={':q': tq_scanned_quantity, ':s': new_status}
-        )
-        print(f"Updated package {package_id}'s tq_scanned_quantity to {tq_scanned_quantity} and status to {new_status}.")
-        
-        # Add additional fields if needed
-        items_table.put_item(Item={
-            'rfid_id': rfid_id,
-            'package_id': package_id,
-            'status': 'READY-FOR-BIN-ALLOCATION',
-            'tq_date': tq_date
-        })
-        print(f"Item saved to DynamoDB: {rfid_id}")
-    
+        print(f"RFID ID: {rfid_id}, Package ID: {package_id}, TQ Date: {tq_date}")
+
+        try:
+            process_read(rfid_id, package_id, tq_date, sessions)
+        except Exception as e:
+            print(f"Record {record.get('messageId')} failed: {e}")
+            failures.append(record['messageId'])
+
     print("All records processing completed.")
-    return {"statusCode": 200}
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in failures]}
@@ -1,10 +1,11 @@
 import json
-from common.utils import storing_table, respond
+from common.utils import respond
+from common.auth import resolve_identity
+from common.transitions import transition, TransitionConflict
 
 def lambda_handler(event, context):
     body = json.loads(event.get('body', '{}'))
-    role = body.get('role')
-    employee_id = body.get('employee_id')
+    role, employee_id = resolve_identity(event, body)
     if role != 'receiver':
         return respond(403, {'message':'Forbidden'})
     try:
@@ -13,16 +14,11 @@ def lambda_handler(event, context):
     except Exception:
         return respond(400, {'message':'Invalid input'})
 
-    r = storing_table.get_item(Key={'storing_order_id': sid}, ConsistentRead=True)
-    order = r.get('Item')
-    if not order:
-        return respond(404, {'message':'Order not found'})
-    if order.get('status') != 'INSPECTION-FAILED':
-        return respond(400, {'message':'Cannot update unless inspection failed'})
-
-    storing_table.update_item(
-        Key={'storing_order_id': sid},
-        UpdateExpression="SET discrepancy_detail = :d, doc_inspection_result = :f",
-        ExpressionAttributeValues={':d': detail, ':f': 'Failure'}
-    )
+    # Only an INSPECTION-FAILED order takes a discrepancy; checked by the update itself
+    try:
+        transition('storing_order', 'record_discrepancy', sid, sets={
+            'discrepancy_detail': detail, 'doc_inspection_result': 'Failure'
+        })
+    except TransitionConflict as e:
+        return respond(404 if e.not_found else 409, {'message': str(e)})
     return respond(200, {'message':'Discrepancy updated'})
\ No newline at end of file